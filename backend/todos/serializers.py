@@ -1,13 +1,42 @@
+from collections.abc import Mapping
+
 from rest_framework import serializers
 from .models import Todo
 
+# Shared formatter so timestamps keep DRF's configured DATETIME_FORMAT
+_datetime_field = serializers.DateTimeField()
+
 
 class TodoSerializer(serializers.ModelSerializer):
     """Todo serializer"""
-    is_completed = serializers.BooleanField(source='completed')
-    created = serializers.DateTimeField(source='created_at', read_only=True)
-    
+
     class Meta:
         model = Todo
-        fields = ['id', 'title', 'description', 'is_completed', 'created', 'updated_at']
-        read_only_fields = ['created', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'title', 'description', 'completed', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def to_internal_value(self, data):
+        # The frontend sends `is_completed`; map it back to the model field. Non-mapping
+        # payloads go straight to DRF, which rejects them with a 400 "Invalid data".
+        if isinstance(data, Mapping) and 'is_completed' in data and 'completed' not in data:
+            data = data.copy()
+            data['completed'] = data['is_completed']
+        try:
+            return super().to_internal_value(data)
+        except serializers.ValidationError as exc:
+            # Report field errors under the name the frontend sent
+            if isinstance(exc.detail, dict) and 'completed' in exc.detail:
+                exc.detail['is_completed'] = exc.detail.pop('completed')
+            raise
+
+    def to_representation(self, instance):
+        # Build the frontend field names (`is_completed`, `created`) directly from the
+        # model attributes instead of resolving each field's `source` per object.
+        return {
+            'id': instance.id,
+            'title': instance.title,
+            'description': instance.description,
+            'is_completed': instance.completed,
+            'created': _datetime_field.to_representation(instance.created_at),
+            'updated_at': _datetime_field.to_representation(instance.updated_at),
+        }
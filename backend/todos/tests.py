@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from .serializers import TodoSerializer
+
+
+class TodoSerializerTests(SimpleTestCase):
+    """TodoSerializer maps the frontend field names to the model fields"""
+
+    def test_is_completed_is_written_to_completed(self):
+        serializer = TodoSerializer(data={'title': 'Buy milk', 'is_completed': True})
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertIs(serializer.validated_data['completed'], True)
+
+    def test_is_completed_errors_keep_the_frontend_field_name(self):
+        serializer = TodoSerializer(data={'title': 'Buy milk', 'is_completed': 'maybe'})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('is_completed', serializer.errors)
+        self.assertNotIn('completed', serializer.errors)
+
+    def test_non_mapping_payload_is_rejected(self):
+        serializer = TodoSerializer(data=['Buy milk'])
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('non_field_errors', serializer.errors)
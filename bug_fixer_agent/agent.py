@@ -1,31 +1,107 @@
 # bug_fixer_agent/agent.py
+import asyncio
+import atexit
+import importlib.util
+import io
 import time
 import os
-from typing import Dict, Tuple
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from bug_fixer_agent.bug_definitions import Bug
+from bug_fixer_agent.cache import FixCache
 from bug_fixer_agent.config import Config
-from bug_fixer_agent.logger import Logger
-from bug_fixer_agent.prompts import Prompts
+from bug_fixer_agent.logger import Logger, get_logger
+from bug_fixer_agent.prompts import CodebaseContext, CodebaseInput, Prompts, index_codebase
+from bug_fixer_agent.rate_limiter import RateLimiter
 from bug_fixer_agent.tools.code_analyzer import CodeAnalyzer
 import re
 
+try:
+    # Optional: RE2 matches in linear time without backtracking, which helps on large batched/streamed responses
+    import re2 as _header_re_engine
+except ImportError:
+    _header_re_engine = re
+
+# Matches the "File: <path>" headers that start each file block in a generated snippet.
+# The multiline flag is inline so the same pattern compiles under both engines.
+_FILE_HEADER_RE = _header_re_engine.compile(r'(?m)^File: (.*)$')
+# HTTP/2 needs the optional h2 package (the httpx[http2] extra)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+# One keep-alive connection pool per process, shared by every agent's GenAI client
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+def _get_http_client(timeout: float) -> httpx.Client:
+    """
+    Returns the process-wide pooled httpx client, using HTTP/2 when the h2 package is installed.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=timeout)
+            atexit.register(_http_client.close)
+        return _http_client
+
+# Code identifiers quoted in backticks in bug descriptions, used to locate the relevant code regions.
+_BACKTICK_RE = re.compile(r'`([^`]+)`')
+# Splits a batched response into its per-bug "## BUG: <name>" sections.
+_BATCH_SECTION_RE = re.compile(r'^## BUG: (.*)$', re.MULTILINE)
+
 class BugFixerAgent:
-    def __init__(self, config: Config, logger: Logger, prompts: Prompts):
+    def __init__(self, config: Config, logger: Optional[Logger] = None, prompts: Optional[Prompts] = None, cache_dir: Optional[str] = None):
+        # Same positional order as before `logger` became optional; prompts is still required
+        if prompts is None:
+            raise ValueError("BugFixerAgent requires a Prompts instance")
         self.config = config
-        self.logger = logger
+        self.logger = logger or get_logger()
         self.prompts = prompts
-        self.code_analyzer = CodeAnalyzer(logger) # Still useful for analysis context
+        self.fix_cache = FixCache(cache_dir or os.path.join(self.config.project_root, ".bugfixer_cache"), self.logger)
+        # Still useful for analysis context; results persist next to the fix cache
+        self.code_analyzer = CodeAnalyzer(self.logger, self.fix_cache.cache_dir if self.config.use_cache else None)
+        # One pool for the whole run instead of one per analyzed bug
+        self._analysis_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bug-analysis")
+        # Set by `_http_options` when the agent makes async calls
+        self._async_http_client: Optional[httpx.AsyncClient] = None
 
         try:
             self.logger.info("Configuring Google GenAI client...")
-            self.client = genai.Client(api_key=self.config.api_key)
+            self.client = genai.Client(api_key=self.config.api_key, http_options=self._http_options())
             self.logger.info("Google GenAI client configured successfully.")
         except Exception as e:
             self.logger.error(f"Failed to configure Google GenAI client: {e}")
             raise
 
-    def analyze_bug(self, bug_name: str, codebase_content: str) -> Dict:
+    def _http_options(self) -> types.HttpOptions:
+        """
+        HTTP options for the GenAI client: sync calls go through the process-wide pooled client.
+        """
+        return types.HttpOptions(httpx_client=_get_http_client(self.config.timeout))
+
+    def close(self):
+        """
+        Persists the analyzer cache, stops the analysis thread pool and closes the async HTTP
+        client if one is still open. Call once at the end of a run.
+        """
+        self.code_analyzer.save_cache()
+        self._analysis_executor.shutdown(wait=False)
+        if self._async_http_client is not None and not self._async_http_client.is_closed:
+            # Normally already closed by `aclose` on the run's own loop; only reached when no loop did
+            asyncio.run(self._async_http_client.aclose())
+
+    def prepare_context(self, codebase_content: str) -> CodebaseContext:
+        """
+        Indexes the codebase content once per run. Pass the returned handle instead of the raw
+        string so prompts for every bug reuse the per-file split.
+        """
+        return index_codebase(codebase_content)
+
+    def analyze_bug(self, bug_name: str, codebase_content: CodebaseInput) -> Dict:
         """
         Performs comprehensive bug analysis including static analysis and context understanding.
         """
@@ -35,16 +111,17 @@ class BugFixerAgent:
         if not bug_info:
             return {"error": f"Bug '{bug_name}' not found in definitions"}
         
-        # Perform static analysis on affected files
-        analysis_results = {}
-        for file_path in bug_info.get("files", []):
-            try:
-                # Use absolute path to file for analysis, as code_analyzer expects it
-                abs_file_path = os.path.join(self.config.project_root, file_path)
-                analysis_results[file_path] = self.code_analyzer.analyze_file(abs_file_path)
-            except Exception as e:
-                self.logger.warning(f"Could not analyze file {file_path}: {e}")
-                analysis_results[file_path] = {"error": str(e)}
+        # Perform static analysis on affected files, overlapping their file I/O and parsing
+        files = bug_info.files
+        # Resolved against this run's project root, which may differ from the package's own location
+        abs_files = [os.path.join(self.config.project_root, file_path) for file_path in files]
+        keywords = self._hotspot_keywords(bug_info)
+        if len(files) > 1:
+            file_analyses = self._analysis_executor.map(lambda paths: self._analyze_affected_file(*paths, keywords), zip(files, abs_files))
+        else:
+            # A single file is analyzed inline; handing it to the pool would only add overhead
+            file_analyses = [self._analyze_affected_file(file_path, abs_file_path, keywords) for file_path, abs_file_path in zip(files, abs_files)]
+        analysis_results = dict(zip(files, file_analyses))
         
         return {
             "bug_info": bug_info, # This is correctly packaged here
@@ -52,83 +129,345 @@ class BugFixerAgent:
             "context": codebase_content
         }
 
-    def generate_fix(self, bug_name: str, codebase_content: str) -> Tuple[str, Dict]:
+    def _analyze_affected_file(self, file_path: str, abs_file_path: str, keywords: List[str]) -> Dict:
+        """
+        Static analysis of one affected file, plus the code region relevant to the bug.
+        CodeAnalyzer guards its result cache with a lock, so this is safe to run from worker threads.
+        """
+        try:
+            file_analysis = self.code_analyzer.analyze_file(abs_file_path)
+            if "error" not in file_analysis and not self.config.full_context:
+                # Copy so the memoized analysis is not modified with bug-specific data
+                file_analysis = dict(file_analysis)
+                file_analysis["snippet"] = self.code_analyzer.extract_region(abs_file_path, keywords, pad=self.config.context_pad_lines)
+            return file_analysis
+        except Exception as e:
+            self.logger.warning(f"Could not analyze file {file_path}: {e}")
+            return {"error": str(e)}
+
+    def _hotspot_keywords(self, bug_info: Bug) -> List[str]:
+        """
+        Collects the code identifiers the bug definition quotes in backticks (e.g. `handleUpdate`).
+        """
+        text = " ".join((bug_info.description, bug_info.root_cause, bug_info.fix_summary))
+        return [keyword.strip() for keyword in _BACKTICK_RE.findall(text) if len(keyword.strip()) >= 3]
+
+    def generate_fix(self, bug_name: str, codebase_content: CodebaseInput) -> Tuple[str, Dict]:
         """
         Generates a code solution for a given bug using the Gemini 2.5 Flash model.
         Returns the corrected code snippet(s) as a string and analysis metadata.
         """
         self.logger.info(f"Generating fix for bug: '{bug_name}'")
         
-        # First, analyze the bug
+        # Analyze the bug and build the enhanced prompt with analysis context
+        prompt, analysis = self._prepare_fix_prompt(bug_name, codebase_content)
+        if not prompt:
+            return "", analysis
+
+        cached = self._cached_fix(bug_name, prompt, analysis)
+        if cached:
+            return cached
+
+        last_error = "Failed to generate fix after all retries"
+        for attempt in range(self.config.max_retries):
+            retry_error = None
+            try:
+                self.logger.info(f"Calling Gemini API (Attempt {attempt + 1}/{self.config.max_retries})...")
+                
+                response_text = self._stream_fix_response(bug_name, prompt, attempt)
+                
+                generated_code_snippet, last_error = self._check_fix_response(bug_name, response_text, attempt)
+                if generated_code_snippet:
+                    self.logger.info("Successfully generated a valid code snippet from the API.")
+                    metadata = self._fix_metadata(bug_name, analysis, attempt)
+                    self._store_fix(prompt, generated_code_snippet, metadata)
+                    return generated_code_snippet, metadata
+
+            except Exception as e:
+                self.logger.error(f"API call error on attempt {attempt + 1} for bug '{bug_name}': {e}")
+                last_error = f"API call failed: {str(e)}"
+                if not self._is_retryable_error(e):
+                    self.logger.error("Non-retryable API error. Not retrying.")
+                    return "", {"error": last_error}
+                retry_error = e
+
+            if attempt < self.config.max_retries - 1:
+                self.logger.info("Retrying...")
+                self._sleep_backoff(attempt, retry_error)
+        
+        self.logger.error("Max retries reached. Failed to generate fix.")
+        return "", {"error": last_error}
+
+    def _fix_generation_config(self) -> types.GenerateContentConfig:
+        """
+        Generation settings used for fix requests.
+        """
+        return types.GenerateContentConfig(
+            temperature=self.config.temperature,
+            max_output_tokens=self.config.max_output_tokens,
+            top_p=self.config.top_p,
+            top_k=self.config.top_k,
+        )
+
+    def _stream_fix_response(self, bug_name: str, prompt: str, attempt: int) -> str:
+        """
+        Streams a fix response and returns its full text. The stream is abandoned early
+        (returning the partial text) if no "File:" header appears within
+        `config.stream_validate_chars` characters, since such a response cannot pass validation.
+        """
+        stream = self.client.models.generate_content_stream(
+            model=self.config.model_name,
+            contents=prompt,
+            config=self._fix_generation_config()
+        )
+        buffer = io.StringIO()
+        prefix_valid = None
+        try:
+            for chunk in stream:
+                buffer.write(chunk.text or "")
+                if prefix_valid is None:
+                    prefix_valid = self._check_stream_prefix(buffer, bug_name, attempt)
+                if prefix_valid is False:
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        return buffer.getvalue()
+
+    def _check_stream_prefix(self, buffer: io.StringIO, bug_name: str, attempt: int) -> Optional[bool]:
+        """
+        Checks the streamed text so far for a "File:" header. Returns True once one appears,
+        False if `config.stream_validate_chars` characters arrived without one, or None to keep reading.
+        """
+        if _FILE_HEADER_RE.search(buffer.getvalue()):
+            return True
+        if buffer.tell() >= self.config.stream_validate_chars:
+            self.logger.warning(f"No 'File:' header in the first {buffer.tell()} characters for '{bug_name}' on attempt {attempt + 1}; abandoning stream.")
+            return False
+        return None
+
+    def _check_fix_response(self, bug_name: str, response_text: str, attempt: int) -> Tuple[str, str]:
+        """
+        Extracts the code snippet from an API response text.
+        Returns the snippet and an empty error, or an empty snippet and the error to report if no retry succeeds.
+        """
+        if not response_text:
+            self.logger.warning(f"Empty response from API for '{bug_name}' on attempt {attempt + 1}")
+            return "", "No response from API after max retries"
+        
+        generated_code_snippet = response_text.strip()
+        
+        # Basic validation: ensure it looks like a code snippet with file headers
+        if not self._validate_code_snippet_format(generated_code_snippet):
+            self.logger.warning(f"Invalid code snippet format for '{bug_name}' on attempt {attempt + 1}")
+            return "", "No valid code snippet generated after max retries"
+
+        return generated_code_snippet, ""
+
+    def _fix_metadata(self, bug_name: str, analysis: Dict, attempt: int) -> Dict:
+        """
+        Metadata returned alongside a successfully generated snippet.
+        """
+        return {
+            "bug_name": bug_name,
+            "analysis": analysis, # <-- This 'analysis' is the full dict containing 'bug_info'
+            "attempts": attempt + 1,
+            "model_used": self.config.model_name
+        }
+
+    def _cached_fix(self, bug_name: str, prompt: str, analysis: Dict) -> Optional[Tuple[str, Dict]]:
+        """
+        Returns a previously generated fix for this exact prompt, or None if caching is off or there is no entry.
+        """
+        if not self.config.use_cache:
+            return None
+        entry = self.fix_cache.get(self.fix_cache.key(self.config.model_name, prompt, self.config.temperature))
+        if not entry:
+            return None
+
+        self.logger.info(f"Using cached fix for bug: '{bug_name}'")
+        metadata = self._fix_metadata(bug_name, analysis, entry["meta"].get("attempts", 1) - 1)
+        metadata["cached"] = True
+        return entry["snippet"], metadata
+
+    def _store_fix(self, prompt: str, snippet: str, metadata: Dict):
+        if self.config.use_cache:
+            self.fix_cache.put(
+                self.fix_cache.key(self.config.model_name, prompt, self.config.temperature),
+                snippet,
+                {"attempts": metadata["attempts"], "model_used": metadata["model_used"]}
+            )
+
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """
+        Rate limits (429), server errors (5xx), timeouts and connection failures are worth retrying.
+        Other client errors (e.g. 400 invalid argument) will fail the same way again.
+        """
+        if isinstance(error, errors.APIError):
+            return error.code == 429 or (error.code or 0) >= 500
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError))
+
+    def _retry_after_seconds(self, error: Optional[Exception]) -> Optional[float]:
+        """
+        Returns the server-requested delay from a Retry-After header, if the error carries one.
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            return max(0.0, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            return None
+
+    def _backoff_delay(self, attempt: int, error: Optional[Exception] = None, base: float = 1.0, cap: float = 30.0) -> float:
+        """
+        Exponential backoff with jitter, or the server's Retry-After when provided.
+        """
+        retry_after = self._retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        return min(base * 2 ** attempt + random.uniform(0, 1), cap)
+
+    def _sleep_backoff(self, attempt: int, error: Optional[Exception] = None, base: float = 1.0, cap: float = 30.0):
+        time.sleep(self._backoff_delay(attempt, error, base, cap))
+
+    def _prepare_fix_prompt(self, bug_name: str, codebase_content: CodebaseInput) -> Tuple[str, Dict]:
+        """
+        Analyzes the bug and builds its enhanced prompt.
+        Returns the prompt and the analysis dict, or an empty prompt and an error dict.
+        """
         analysis = self.analyze_bug(bug_name, codebase_content) # This returns the dict with 'bug_info'
         if "error" in analysis:
             return "", {"error": analysis["error"]}
         
-        # Generate enhanced prompt with analysis context
         try:
-            prompt = self.prompts.generate_enhanced_prompt(bug_name, codebase_content, analysis)
+            if self.config.full_context:
+                prompt = self.prompts.generate_enhanced_prompt(bug_name, codebase_content, analysis)
+            else:
+                prompt = self.prompts.generate_enhanced_prompt_trimmed(bug_name, codebase_content, analysis)
         except Exception as e:
             self.logger.error(f"Error generating prompt for {bug_name}: {e}")
             return "", {"error": f"Error generating prompt: {e}"}
         
-        if "Error:" in prompt or not prompt.strip():
+        # Only the prompt's own error message counts; the embedded code may legitimately contain "Error:"
+        if prompt.startswith("Error:") or not prompt.strip():
             self.logger.error(f"Could not generate a valid prompt for {bug_name}: {prompt}")
             return "", {"error": "Invalid prompt generated"}
 
-        generated_code_snippet = ""
+        return prompt, analysis
+
+    def generate_fixes_batch(self, bug_names: List[str], codebase_content: CodebaseInput) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Generates fixes for several bugs, packing up to `config.max_batch_size` bugs
+        into each Gemini call instead of issuing one call per bug.
+        Returns a mapping of bug name to the same (snippet, metadata) tuple as `generate_fix`.
+        """
+        self.logger.info(f"Generating fixes for {len(bug_names)} bugs in batches of up to {self.config.max_batch_size}")
+
+        results = {}
+        prepared = {}
+        for bug_name in bug_names:
+            prompt, analysis = self._prepare_fix_prompt(bug_name, codebase_content)
+            if not prompt:
+                results[bug_name] = ("", analysis)
+                continue
+            cached = self._cached_fix(bug_name, prompt, analysis)
+            if cached:
+                results[bug_name] = cached
+            else:
+                prepared[bug_name] = (prompt, analysis)
+
+        # Keep batches small: latency grows faster than linearly with the number of answers per response
+        batch_size = max(1, self.config.max_batch_size)
+        names = list(prepared)
+        for start in range(0, len(names), batch_size):
+            results.update(self._generate_fix_batch(names[start:start + batch_size], prepared))
+
+        return {bug_name: results[bug_name] for bug_name in bug_names}
+
+    def _generate_fix_batch(self, batch: List[str], prepared: Dict[str, Tuple[str, Dict]]) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Sends one batch of prepared prompts in a single Gemini call and splits the answer per bug.
+        Bugs whose section is missing or invalid are retried together in the next attempt.
+        """
+        results = {}
+        pending = list(batch)
+        last_error = "No valid code snippet generated after max retries"
         for attempt in range(self.config.max_retries):
+            prompt = self._build_batch_prompt(pending, prepared)
+            retry_error = None
             try:
-                self.logger.info(f"Calling Gemini API (Attempt {attempt + 1}/{self.config.max_retries})...")
-                
+                self.logger.info(f"Calling Gemini API for batch of {len(pending)} bugs (Attempt {attempt + 1}/{self.config.max_retries})...")
+
                 response = self.client.models.generate_content(
                     model=self.config.model_name,
                     contents=prompt,
                     config=types.GenerateContentConfig(
                         temperature=self.config.temperature,
-                        max_output_tokens=self.config.max_output_tokens,
+                        max_output_tokens=self.config.max_output_tokens * len(pending),
                         top_p=self.config.top_p,
                         top_k=self.config.top_k,
                     )
                 )
-                
-                if not response or not response.text:
-                    self.logger.warning(f"Empty response from API for '{bug_name}' on attempt {attempt + 1}")
-                    if attempt == self.config.max_retries - 1:
-                        self.logger.error("Max retries reached. No response from API.")
-                        return "", {"error": "No response from API after max retries"}
-                    time.sleep(2)
-                    continue
-                
-                generated_code_snippet = response.text.strip()
-                
-                # Basic validation: ensure it looks like a code snippet with file headers
-                if not self._validate_code_snippet_format(generated_code_snippet):
-                    self.logger.warning(f"Invalid code snippet format for '{bug_name}' on attempt {attempt + 1}")
-                    if attempt == self.config.max_retries - 1:
-                        self.logger.error("Max retries reached. No valid code snippet generated.")
-                        return "", {"error": "No valid code snippet generated after max retries"}
-                    time.sleep(2)
-                    continue
-                
-                self.logger.info("Successfully generated a valid code snippet from the API.")
-                
-                return generated_code_snippet, {
-                    "bug_name": bug_name,
-                    "analysis": analysis, # <-- This 'analysis' is the full dict containing 'bug_info'
-                    "attempts": attempt + 1,
-                    "model_used": self.config.model_name
-                }
+
+                sections = self._split_batch_response(response.text if response else "")
+                last_error = "No valid code snippet generated after max retries"
+                for bug_name in list(pending):
+                    snippet = sections.get(bug_name, "")
+                    if not self._validate_code_snippet_format(snippet):
+                        self.logger.warning(f"Missing or invalid code snippet for '{bug_name}' in batch on attempt {attempt + 1}")
+                        continue
+                    metadata = self._fix_metadata(bug_name, prepared[bug_name][1], attempt)
+                    metadata["batched"] = True
+                    self._store_fix(prepared[bug_name][0], snippet, metadata)
+                    results[bug_name] = (snippet, metadata)
+                    pending.remove(bug_name)
 
             except Exception as e:
-                self.logger.error(f"API call error on attempt {attempt + 1} for bug '{bug_name}': {e}")
-                if attempt < self.config.max_retries - 1:
-                    self.logger.info("Retrying...")
-                    time.sleep(2)
-                else:
-                    self.logger.error("Max retries reached. Failed to generate fix.")
-                    return "", {"error": f"API call failed: {str(e)}"}
-        
-        return "", {"error": "Failed to generate fix after all retries"}
+                self.logger.error(f"API call error on batch attempt {attempt + 1}: {e}")
+                last_error = f"API call failed: {str(e)}"
+                if not self._is_retryable_error(e):
+                    self.logger.error("Non-retryable API error. Not retrying.")
+                    break
+                retry_error = e
+
+            if not pending:
+                break
+            if attempt < self.config.max_retries - 1:
+                self.logger.info("Retrying remaining bugs in batch...")
+                self._sleep_backoff(attempt, retry_error)
+
+        for bug_name in pending:
+            self.logger.error(f"Failed to generate fix for '{bug_name}' in batch: {last_error}")
+            results[bug_name] = ("", {"error": last_error})
+
+        return results
+
+    def _build_batch_prompt(self, bug_names: List[str], prepared: Dict[str, Tuple[str, Dict]]) -> str:
+        """
+        Concatenates the per-bug prompts under delimited headers with instructions for the answer layout.
+        """
+        prompt_parts = [
+            f"You are given {len(bug_names)} independent bugs, each introduced by a '=== BUG: <name> ===' header.",
+            "Answer every bug separately. Start each answer with a line '## BUG: <name>' using the exact bug name,",
+            "followed only by the corrected code snippet(s) in the output format requested for that bug.",
+            "",
+        ]
+        for bug_name in bug_names:
+            prompt_parts.append(f"=== BUG: {bug_name} ===")
+            prompt_parts.append(prepared[bug_name][0])
+            prompt_parts.append("")
+        return "\n".join(prompt_parts)
+
+    def _split_batch_response(self, response_text: str) -> Dict[str, str]:
+        """
+        Splits a batched response into a mapping of bug name to its code snippet section.
+        """
+        parts = _BATCH_SECTION_RE.split(response_text or "")
+        # parts = [preamble, name1, body1, name2, body2, ...]
+        return {name.strip(): body.strip() for name, body in zip(parts[1::2], parts[2::2])}
 
     def _validate_code_snippet_format(self, code_content: str) -> bool:
         """
@@ -139,7 +478,7 @@ class BugFixerAgent:
             return False
         
         # Check for at least one "File: <path>" line
-        if not re.search(r'^File: .*', code_content, re.MULTILINE):
+        if not _FILE_HEADER_RE.search(code_content):
             return False
         
         # Check for presence of markdown code blocks
@@ -158,14 +497,16 @@ class BugFixerAgent:
         """
         # Retrieve the original analysis dict (which contains 'bug_info') from analysis_metadata
         original_analysis_dict = analysis_metadata.get("analysis", {})
-        bug_info = original_analysis_dict.get("bug_info", {}) # <-- CORRECTED RETRIEVAL HERE
+        bug_info = original_analysis_dict.get("bug_info")
+        # Plain dict from here on; the summary is serialized into reports
+        bug_info = bug_info._asdict() if bug_info else {}
         
         # Extract files affected from the code snippet itself, if not already in bug_info
         files_affected = bug_info.get("files", [])
         if not files_affected:
             # Try to parse from the snippet if bug_info was missing it (fallback)
-            detected_files = re.findall(r'^File: (.*)', corrected_code_snippet, re.MULTILINE)
-            files_affected = list(set(detected_files))
+            # dict.fromkeys dedupes while keeping the order files appear in the snippet
+            files_affected = list(dict.fromkeys(_FILE_HEADER_RE.findall(corrected_code_snippet)))
 
         return {
             "bug_name": bug_name,
@@ -177,47 +518,254 @@ class BugFixerAgent:
             "analysis_metadata": analysis_metadata # Keep the full metadata
         }
 
-    def generate_failure_analysis_and_suggestions(self, bug_name: str, original_error_message: str, previous_ai_generated_code: str, codebase_content: str) -> Dict:
+    def generate_failure_analysis_and_suggestions(self, bug_name: str, original_error_message: str, previous_ai_generated_code: str, codebase_content: CodebaseInput) -> Dict:
         """
         Consults the LLM to get an analysis and possible solutions for a failed bug fix.
         """
         self.logger.info(f"Generating failure analysis for bug '{bug_name}'...")
         
-        # Extract relevant code from the codebase_content for the prompt
+        prompt = self._failure_analysis_prompt(bug_name, original_error_message, previous_ai_generated_code, codebase_content)
+
+        for attempt in range(self.config.max_retries):
+            try:
+                response = self.client.models.generate_content(
+                    model=self.config.model_name,
+                    contents=prompt,
+                    config=self._failure_analysis_generation_config()
+                )
+
+                if response and response.text:
+                    self.logger.info(f"Generated failure analysis for {bug_name} (Attempt {attempt + 1}).")
+                    return {"analysis": response.text.strip(), "success": True}
+                
+                self.logger.warning(f"Empty response for failure analysis on attempt {attempt + 1}")
+                retry_error = None
+
+            except Exception as e:
+                self.logger.error(f"API call error for failure analysis on attempt {attempt + 1}: {e}")
+                if not self._is_retryable_error(e):
+                    break
+                retry_error = e
+
+            if attempt < self.config.max_retries - 1:
+                self._sleep_backoff(attempt, retry_error)
+
+        self.logger.error(f"Failed to generate failure analysis after {self.config.max_retries} attempts.")
+        return {"analysis": "Failed to generate intelligent suggestions due to API error.", "success": False}
+
+    def _failure_analysis_prompt(self, bug_name: str, original_error_message: str, previous_ai_generated_code: str, codebase_content: CodebaseInput) -> str:
+        """
+        Builds the failure analysis prompt with the relevant code extracted from the codebase content.
+        """
         bug_info = self.prompts.bug_defs.get_bug_by_name(bug_name)
-        files_to_check = bug_info["files"] if bug_info else []
+        files_to_check = bug_info.files if bug_info else ()
         relevant_context = self.prompts._extract_relevant_files(codebase_content, files_to_check)
 
-        prompt = self.prompts.generate_failure_analysis_prompt(
+        return self.prompts.generate_failure_analysis_prompt(
             bug_name=bug_name,
             original_error_message=original_error_message,
             previous_ai_generated_code=previous_ai_generated_code,
             relevant_context_code=relevant_context
         )
 
+    def _failure_analysis_generation_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            temperature=0.3, # Slightly higher temperature for more creative suggestions
+            max_output_tokens=self.config.max_output_tokens, # Allow full code solution
+            top_p=self.config.top_p,
+            top_k=self.config.top_k,
+        )
+
+
+class AsyncBugFixerAgent(BugFixerAgent):
+    """
+    Asynchronous BugFixerAgent that issues Gemini calls concurrently through the async client.
+    In-flight requests are bounded by `config.max_concurrency` and throttled to `config.rpm`.
+    """
+    def __init__(self, config: Config, logger: Optional[Logger] = None, prompts: Optional[Prompts] = None, cache_dir: Optional[str] = None):
+        super().__init__(config, logger, prompts, cache_dir)
+        self.rate_limiter = RateLimiter(self.config.rpm)
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+    def _http_options(self) -> types.HttpOptions:
+        """
+        Adds a pooled httpx.AsyncClient for `client.aio`. It is per agent, since its connections
+        belong to the event loop that first uses them (the runner's).
+        """
+        self._async_http_client = httpx.AsyncClient(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=self.config.timeout)
+        return super()._http_options().model_copy(update={"httpx_async_client": self._async_http_client})
+
+    async def aclose(self):
+        """
+        Closes the async HTTP client. Await it on the loop that made the calls, before that loop ends.
+        """
+        await self._async_http_client.aclose()
+
+    async def _generate_content_async(self, prompt: str, generation_config: types.GenerateContentConfig):
+        """
+        Makes one async Gemini call once a concurrency slot and a rate-limit token are available.
+        """
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            return await self.client.aio.models.generate_content(
+                model=self.config.model_name,
+                contents=prompt,
+                config=generation_config
+            )
+
+    async def _stream_fix_response_async(self, bug_name: str, prompt: str, attempt: int) -> str:
+        """
+        Async counterpart of `_stream_fix_response`. A concurrency slot and a rate-limit token
+        are held for the whole stream.
+        """
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.config.model_name,
+                contents=prompt,
+                config=self._fix_generation_config()
+            )
+            buffer = io.StringIO()
+            prefix_valid = None
+            try:
+                async for chunk in stream:
+                    buffer.write(chunk.text or "")
+                    if prefix_valid is None:
+                        prefix_valid = self._check_stream_prefix(buffer, bug_name, attempt)
+                    if prefix_valid is False:
+                        break
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose:
+                    await aclose()
+            return buffer.getvalue()
+
+    async def _generate_content_hedged(self, prompt: str, generation_config: types.GenerateContentConfig):
+        """
+        Makes an async Gemini call, hedged as described in `_hedged`.
+        """
+        return await self._hedged(lambda: self._generate_content_async(prompt, generation_config))
+
+    async def _hedged(self, make_call: Callable[[], Awaitable]):
+        """
+        Awaits `make_call()` and, if it has not returned within `config.hedge_after_s`,
+        starts a duplicate call and takes whichever finishes first. The slower one is cancelled.
+        """
+        primary = asyncio.create_task(make_call())
+        tasks = {primary}
+        try:
+            if not self.config.hedge_after_s:
+                return await primary
+
+            done, _ = await asyncio.wait(tasks, timeout=self.config.hedge_after_s)
+            if not done:
+                self.logger.warning(f"No response after {self.config.hedge_after_s}s, sending a hedged request...")
+                tasks.add(asyncio.create_task(make_call()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_fix_async(self, bug_name: str, codebase_content: CodebaseInput) -> Tuple[str, Dict]:
+        """
+        Async counterpart of `generate_fix`.
+        """
+        self.logger.info(f"Generating fix for bug: '{bug_name}'")
+
+        # File analysis is blocking I/O and parsing; keep it off the event loop
+        prompt, analysis = await asyncio.to_thread(self._prepare_fix_prompt, bug_name, codebase_content)
+        if not prompt:
+            return "", analysis
+
+        # FixCache reads and writes are disk I/O too
+        cached = await asyncio.to_thread(self._cached_fix, bug_name, prompt, analysis)
+        if cached:
+            return cached
+
+        generated_code_snippet, error, attempt = await self._generate_snippet_async(bug_name, prompt)
+        if not generated_code_snippet:
+            return "", {"error": error}
+
+        metadata = self._fix_metadata(bug_name, analysis, attempt)
+        await asyncio.to_thread(self._store_fix, prompt, generated_code_snippet, metadata)
+        return generated_code_snippet, metadata
+
+    async def _generate_snippet_async(self, bug_name: str, prompt: str) -> Tuple[str, str, int]:
+        """
+        Calls the API with retries until a valid snippet is produced.
+        Returns (snippet, "", attempt) on success or ("", error, attempt) on failure.
+        """
+        last_error = "Failed to generate fix after all retries"
         for attempt in range(self.config.max_retries):
+            retry_error = None
             try:
-                response = self.client.models.generate_content(
-                    model=self.config.model_name,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        temperature=0.3, # Slightly higher temperature for more creative suggestions
-                        max_output_tokens=self.config.max_output_tokens, # Allow full code solution
-                        top_p=self.config.top_p,
-                        top_k=self.config.top_k,
-                    )
-                )
+                self.logger.info(f"Calling Gemini API for '{bug_name}' (Attempt {attempt + 1}/{self.config.max_retries})...")
+
+                response_text = await self._hedged(lambda: self._stream_fix_response_async(bug_name, prompt, attempt))
+
+                generated_code_snippet, last_error = self._check_fix_response(bug_name, response_text, attempt)
+                if generated_code_snippet:
+                    self.logger.info(f"Successfully generated a valid code snippet for '{bug_name}'.")
+                    return generated_code_snippet, "", attempt
+
+            except Exception as e:
+                self.logger.error(f"API call error on attempt {attempt + 1} for bug '{bug_name}': {e}")
+                last_error = f"API call failed: {str(e)}"
+                if not self._is_retryable_error(e):
+                    self.logger.error(f"Non-retryable API error for '{bug_name}'. Not retrying.")
+                    return "", last_error, attempt
+                retry_error = e
+
+            if attempt < self.config.max_retries - 1:
+                self.logger.info(f"Retrying '{bug_name}'...")
+                await asyncio.sleep(self._backoff_delay(attempt, retry_error))
+
+        self.logger.error(f"Max retries reached. Failed to generate fix for '{bug_name}'.")
+        return "", last_error, self.config.max_retries - 1
+
+    async def generate_fixes_async(self, bug_names: List[str], codebase_content: CodebaseInput) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Generates fixes for all given bugs concurrently.
+        Returns a mapping of bug name to the (snippet, metadata) tuple from `generate_fix_async`.
+        """
+        results = await asyncio.gather(*(self.generate_fix_async(bug_name, codebase_content) for bug_name in bug_names))
+        return dict(zip(bug_names, results))
+
+    async def generate_failure_analysis_and_suggestions_async(self, bug_name: str, original_error_message: str, previous_ai_generated_code: str, codebase_content: CodebaseInput) -> Dict:
+        """
+        Async counterpart of `generate_failure_analysis_and_suggestions`.
+        """
+        self.logger.info(f"Generating failure analysis for bug '{bug_name}'...")
+
+        prompt = self._failure_analysis_prompt(bug_name, original_error_message, previous_ai_generated_code, codebase_content)
+
+        for attempt in range(self.config.max_retries):
+            try:
+                response = await self._generate_content_hedged(prompt, self._failure_analysis_generation_config())
 
                 if response and response.text:
                     self.logger.info(f"Generated failure analysis for {bug_name} (Attempt {attempt + 1}).")
                     return {"analysis": response.text.strip(), "success": True}
-                
+
                 self.logger.warning(f"Empty response for failure analysis on attempt {attempt + 1}")
-                time.sleep(1) # Short delay before retry
+                retry_error = None
 
             except Exception as e:
                 self.logger.error(f"API call error for failure analysis on attempt {attempt + 1}: {e}")
-                time.sleep(1) # Short delay before retry
+                if not self._is_retryable_error(e):
+                    break
+                retry_error = e
+
+            if attempt < self.config.max_retries - 1:
+                await asyncio.sleep(self._backoff_delay(attempt, retry_error))
 
         self.logger.error(f"Failed to generate failure analysis after {self.config.max_retries} attempts.")
-        return {"analysis": "Failed to generate intelligent suggestions due to API error."}
\ No newline at end of file
+        return {"analysis": "Failed to generate intelligent suggestions due to API error.", "success": False}
@@ -0,0 +1,64 @@
+# bug_fixer_agent/cache.py
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+from bug_fixer_agent.logger import Logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode("utf-8")
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FixCache:
+    """
+    Content-addressed on-disk cache of generated fixes.
+    Entries are keyed by a hash of the model name, the sampling temperature and the exact
+    prompt, so any change to the bug definition or the relevant code produces a new key.
+    """
+    def __init__(self, cache_dir: str, logger: Logger):
+        self.cache_dir = cache_dir
+        self.logger = logger
+
+    def key(self, model_name: str, prompt: str, temperature: Optional[float] = None) -> str:
+        return hashlib.sha256(f"{model_name}\n{temperature}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Returns the cached entry ({"snippet": ..., "meta": ...}) or None on a miss.
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, snippet: str, meta: Dict):
+        """
+        Stores an entry atomically so concurrent readers never see a partial file.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(_dumps({"snippet": snippet, "meta": meta}))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {key}: {e}")
@@ -1,12 +1,33 @@
 # bug_fixer_agent/config.py
+import functools
 import os
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 
+# Project paths, resolved once at import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+BACKEND_PATH = os.path.join(PROJECT_ROOT, "backend")
+FRONTEND_PATH = os.path.join(PROJECT_ROOT, "frontend")
+_DOTENV_PATH = os.path.join(os.path.dirname(__file__), '.env')
+
+@dataclass(frozen=True)
+class _ConfigSnapshot:
+    api_key: Optional[str]
+
+@functools.lru_cache(maxsize=1)
+def _read_config() -> _ConfigSnapshot:
+    """
+    Loads the .env file and reads the environment once per process.
+    """
+    load_dotenv(dotenv_path=_DOTENV_PATH)
+    return _ConfigSnapshot(api_key=os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY"))
+
 class Config:
     def __init__(self):
-        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
-        self.api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+        snapshot = _read_config()
+        self.api_key = snapshot.api_key
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY not found. Please set it in the .env file.")
         
@@ -21,8 +42,25 @@ class Config:
         self.max_output_tokens = 16384  # Increased for larger patches
         self.top_p = 0.8
         self.top_k = 40
+        # Prompt context: only the regions around the code a bug mentions, unless full_context is set
+        self.full_context = False
+        self.context_pad_lines = 40
+        self.stream_validate_chars = 512  # Abandon a streamed fix if no "File:" header appears within this many characters
+        self.max_batch_size = 4  # Bugs packed into one request by generate_fixes_batch
+        self.use_batch = False  # Set to True to send bugs in batched requests instead of one request per bug
+
+        # Concurrency limits for AsyncBugFixerAgent; keep rpm below the API's per-minute quota
+        self.rpm = 10
+        self.max_concurrency = 4
+        # Set use_async to False to fan bugs out over a thread pool with the sync client instead
+        self.use_async = True
+        self.max_workers = 4  # 4-8 threads is enough to overlap API calls without tripping quotas
+        self.use_cache = True  # Reuse fixes from .bugfixer_cache when the prompt is unchanged
+        # Seconds before a duplicate (hedged) request is sent; 0 disables. Off by default: fixes with large
+        # outputs legitimately run long, and every hedge spends an rpm token and waits for a concurrency slot
+        self.hedge_after_s = 0
         
         # Project paths
-        self.project_root = os.path.dirname(os.path.dirname(__file__))
-        self.backend_path = os.path.join(self.project_root, "backend")
-        self.frontend_path = os.path.join(self.project_root, "frontend")
\ No newline at end of file
+        self.project_root = PROJECT_ROOT
+        self.backend_path = BACKEND_PATH
+        self.frontend_path = FRONTEND_PATH
\ No newline at end of file
@@ -1,10 +1,23 @@
 # bug_fixer_agent/logger.py
+import atexit
 import logging
+import queue
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Shared Logger instances by name, see get_logger()
+_LOGGERS = {}
+_LOGGERS_LOCK = threading.Lock()
 
 class Logger:
-    def __init__(self, name="BugFixerAgent"):
+    def __init__(self, name="BugFixerAgent", use_queue=False):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         
@@ -12,16 +25,18 @@ class Logger:
         if not self.logger.handlers:
             console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(_FORMATTER)
             
-            # Create formatter
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            console_handler.setFormatter(formatter)
-            
-            # Add handler to logger
-            self.logger.addHandler(console_handler)
+            if use_queue:
+                # Callers only enqueue records; a background listener thread does the stdout I/O
+                log_queue = queue.SimpleQueue()
+                listener = QueueListener(log_queue, console_handler)
+                listener.start()
+                atexit.register(listener.stop)
+                self.logger.addHandler(QueueHandler(log_queue))
+            else:
+                # Add handler to logger
+                self.logger.addHandler(console_handler)
 
     def info(self, message):
         self.logger.info(message)
@@ -39,14 +54,14 @@ class Logger:
         """
         Returns current timestamp in a consistent format.
         """
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.now().isoformat(sep=" ", timespec="seconds")
 
     def log_bug_processing(self, bug_name: str, status: str, details: str = ""):
         """
         Specialized logging for bug processing events.
         """
-        timestamp = self.get_timestamp()
-        message = f"[{timestamp}] Bug: {bug_name} | Status: {status}"
+        # The formatter already prefixes each record with its asctime
+        message = f"Bug: {bug_name} | Status: {status}"
         if details:
             message += f" | Details: {details}"
         self.info(message)
@@ -55,9 +70,18 @@ class Logger:
         """
         Specialized logging for API calls.
         """
-        timestamp = self.get_timestamp()
         status = "SUCCESS" if success else "FAILED"
-        message = f"[{timestamp}] API Call | Model: {model} | Attempt: {attempt} | Status: {status}"
+        message = f"API Call | Model: {model} | Attempt: {attempt} | Status: {status}"
         if error:
             message += f" | Error: {error}"
-        self.info(message)
\ No newline at end of file
+        self.info(message)
+
+
+def get_logger(name="BugFixerAgent") -> Logger:
+    """
+    Returns the process-wide Logger for `name`, creating it (queue-backed) on first use.
+    """
+    with _LOGGERS_LOCK:
+        if name not in _LOGGERS:
+            _LOGGERS[name] = Logger(name, use_queue=True)
+        return _LOGGERS[name]
@@ -1,13 +1,56 @@
 # bug_fixer_agent/prompts.py
-from bug_fixer_agent.bug_definitions import BugDefinitions
+from typing import NamedTuple, Optional, Tuple, Union
+from bug_fixer_agent.bug_definitions import Bug, BugDefinitions
 from bug_fixer_agent.config import Config
 
+# Same file block layout as inspector.py output
+HEADER_LINE = "*" * 100
+FILE_SEPARATOR = "\n\n"
+
+class CodebaseContext(NamedTuple):
+    """
+    The codebase content split once into per-file blocks. Build it with `index_codebase` and
+    pass it wherever codebase content is accepted, so each bug's prompt doesn't re-split the whole text.
+    """
+    content: str
+    file_blocks: Tuple[Tuple[str, Tuple[str, ...]], ...]  # (file path, block lines) in codebase order
+
+CodebaseInput = Union[str, CodebaseContext]
+
+def index_codebase(codebase_content: str) -> CodebaseContext:
+    """
+    Splits the codebase content into the lines `_extract_relevant_files` emits for each file.
+    Not cached: callers index the content once and pass the returned context along, and a
+    module-level cache would keep whole codebase strings alive for the life of the process.
+    """
+    lines = codebase_content.split('\n')
+    file_blocks = []
+    block_lines = None
+
+    for i, line in enumerate(lines):
+        if line.startswith(HEADER_LINE):
+            if i + 1 < len(lines) and lines[i+1].startswith('File: '):
+                block_lines = [line, lines[i+1]]
+                if i + 2 < len(lines):
+                    block_lines.append(lines[i+2])
+                block_lines.append('')
+                file_blocks.append((lines[i+1][6:].strip(), block_lines))
+            else:
+                block_lines = None
+            continue
+
+        if block_lines is not None:
+            block_lines.append(line)
+
+    return CodebaseContext(codebase_content, tuple((path, tuple(block)) for path, block in file_blocks))
+
 class Prompts:
-    def __init__(self):
-        self.bug_defs = BugDefinitions()
-        self.config = Config() 
+    def __init__(self, bug_defs: Optional[BugDefinitions] = None, config: Optional[Config] = None):
+        # Callers can share one BugDefinitions/Config instead of building new ones
+        self.bug_defs = bug_defs or BugDefinitions()
+        self.config = config or Config()
 
-    def generate_enhanced_prompt(self, bug_name: str, codebase_content: str, analysis: dict) -> str:
+    def generate_enhanced_prompt(self, bug_name: str, codebase_content: CodebaseInput, analysis: dict) -> str:
         """
         Generates a concise prompt for generating a minimal, targeted code solution.
         """
@@ -16,13 +59,41 @@ class Prompts:
         if not bug:
             return "Error: Bug definition not found." 
 
-        description = bug["description"]
-        files_to_check = bug["files"]
-        root_cause = bug.get("root_cause", "") # <-- Root Cause is extracted here
-        fix_concept = bug.get("fix_summary", "") 
-        
         # Extract only the relevant files from the codebase for context
-        relevant_content = self._extract_relevant_files(codebase_content, files_to_check)
+        relevant_content = self._extract_relevant_files(codebase_content, bug.files)
+        return self._build_fix_prompt(bug_name, bug, relevant_content)
+
+    def generate_enhanced_prompt_trimmed(self, bug_name: str, codebase_content: CodebaseInput, analysis: dict) -> str:
+        """
+        Same prompt as `generate_enhanced_prompt`, but the code context is limited to the
+        regions of each affected file around the code the bug refers to
+        (`analysis["static_analysis"][file]["snippet"]`) instead of whole files.
+        Files without a snippet fall back to their full block from the codebase content.
+        """
+        bug = self.bug_defs.get_bug_by_name(bug_name)
+        
+        if not bug:
+            return "Error: Bug definition not found." 
+
+        static_analysis = analysis.get("static_analysis", {})
+        blocks = []
+        for file_path in bug.files:
+            snippet = static_analysis.get(file_path, {}).get("snippet")
+            if snippet is None:
+                blocks.append(self._extract_relevant_files(codebase_content, [file_path]))
+            else:
+                blocks.append(f"{HEADER_LINE}\nFile: {file_path}\n{HEADER_LINE}\n\n{snippet}")
+        relevant_content = FILE_SEPARATOR.join(blocks).strip()
+        return self._build_fix_prompt(bug_name, bug, relevant_content)
+
+    def _build_fix_prompt(self, bug_name: str, bug: Bug, relevant_content: str) -> str:
+        """
+        Fills the fix prompt template for a bug with the given code context.
+        """
+        description = bug.description
+        files_to_check = bug.files
+        root_cause = bug.root_cause
+        fix_concept = bug.fix_summary
         
         return f"""Provide **ONLY the corrected code snippet(s)** to fix a specific bug in this Django/React application.
 **Your primary goal is minimality and precision.** Do NOT rewrite entire functions/components, change unrelated lines, or alter API/function signatures unless explicitly necessary for the bug and justified by the analysis.
@@ -82,38 +153,18 @@ class SomeView(APIView):
         """
         return self.generate_enhanced_prompt(bug_name, codebase_content, {})
 
-    def _extract_relevant_files(self, codebase_content: str, target_files: list) -> str:
+    def _extract_relevant_files(self, codebase_content: CodebaseInput, target_files: list) -> str:
         """
         Extracts only the relevant files from the codebase content.
         Includes the file headers for context, as generated by inspector.py.
         """
-        lines = codebase_content.split('\n')
+        if not isinstance(codebase_content, CodebaseContext):
+            codebase_content = index_codebase(codebase_content)
+
         relevant_lines = []
-        in_file_block = False 
-        is_target_file = False 
-        
-        for i, line in enumerate(lines):
-            if line.startswith('****************************************************************************************************'):
-                if i + 1 < len(lines) and lines[i+1].startswith('File: '):
-                    current_file_path = lines[i+1][6:].strip()
-                    in_file_block = True 
-                    is_target_file = current_file_path in target_files 
-                    
-                    if is_target_file:
-                        relevant_lines.append(line) 
-                        relevant_lines.append(lines[i+1]) 
-                        if i + 2 < len(lines):
-                            relevant_lines.append(lines[i+2]) 
-                        relevant_lines.append('') 
-                    continue 
-                else:
-                    in_file_block = False
-                    is_target_file = False 
-                    continue 
-            
-            if in_file_block and is_target_file:
-                relevant_lines.append(line)
-            
+        for file_path, block_lines in codebase_content.file_blocks:
+            if file_path in target_files:
+                relevant_lines.extend(block_lines)
         return '\n'.join(relevant_lines).strip()
 
 
@@ -153,10 +204,10 @@ In `frontend/src/components/TodoList.tsx`, locate the `useEffect` hook that call
             "API Integration Bug": """
 In `backend/todos/serializers.py`, within the `TodoSerializer` class:
 - The problem is a field name mismatch: backend `completed` should map to frontend `is_completed`, and `created_at` to `created`.
-- The provided `CODE CONTEXT` already contains the correct aliasing: `is_completed = serializers.BooleanField(source='completed')` and `created = serializers.DateTimeField(source='created_at', read_only=True)`.
-- **CRITICAL:** Ensure the `Meta.fields` list correctly includes ALL necessary fields: `['id', 'title', 'description', 'is_completed', 'created', 'updated_at']`.
-- **CRITICAL:** Ensure `read_only_fields = ['created', 'updated_at']` is present in the `Meta` class.
-- Do NOT remove `description` or `updated_at` from the `Meta.fields` or `read_only_fields`.
+- The provided `CODE CONTEXT` already maps the names: `to_representation` emits `is_completed` and `created` from `completed` and `created_at`, and `to_internal_value` maps incoming `is_completed` back to `completed`.
+- **CRITICAL:** Ensure the `Meta.fields` list includes ALL model fields: `['id', 'title', 'description', 'completed', 'created_at', 'updated_at']`, and that `to_representation` returns `id`, `title`, `description`, `is_completed`, `created` and `updated_at`.
+- **CRITICAL:** Ensure `read_only_fields = ['created_at', 'updated_at']` is present in the `Meta` class.
+- Do NOT remove `description` or `updated_at` from the `Meta.fields`, `read_only_fields` or `to_representation`.
 - If the `CODE CONTEXT` already shows the correct structure, your output should simply reflect that correct structure, confirming the existing code is the solution.
 """,
         }
@@ -167,7 +218,7 @@ In `backend/todos/serializers.py`, within the `TodoSerializer` class:
         Generates a concise prompt for the LLM to analyze a previous failure and provide an improved solution.
         """
         bug = self.bug_defs.get_bug_by_name(bug_name)
-        bug_description = bug["description"] if bug else "N/A."
+        bug_description = bug.description if bug else "N/A."
 
         prompt_parts = [
             f"Previous code solution for '{bug_name}' failed. Analyze why and provide the improved solution.",
@@ -0,0 +1,29 @@
+# bug_fixer_agent/rate_limiter.py
+import asyncio
+import collections
+import time
+
+class RateLimiter:
+    """
+    Async sliding-window limiter that keeps API calls below a requests-per-minute quota:
+    at most `rpm` calls start within any `period` seconds (one minute by default).
+    """
+    def __init__(self, rpm: int, period: float = 60.0):
+        self.capacity = max(1, rpm)
+        self.period = period
+        # Start times of the most recent calls, oldest first; never longer than capacity
+        self._starts = collections.deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits until a request slot is available and consumes it.
+        """
+        async with self._lock:
+            while len(self._starts) >= self.capacity:
+                wait = self._starts[0] + self.period - time.monotonic()
+                if wait <= 0:
+                    self._starts.popleft()
+                else:
+                    await asyncio.sleep(wait)
+            self._starts.append(time.monotonic())
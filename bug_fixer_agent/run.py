@@ -1,29 +1,60 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import mmap
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from pathlib import Path
 from tqdm import tqdm
-from typing import Dict, List
+from tqdm.asyncio import tqdm as async_tqdm
+from typing import Dict, List, TextIO
 
 # Adjust path to import from the agent's directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from bug_fixer_agent.bug_definitions import BugDefinitions
-from bug_fixer_agent.agent import BugFixerAgent
+from bug_fixer_agent.bug_definitions import Bug, BugDefinitions
+from bug_fixer_agent.agent import AsyncBugFixerAgent
 from bug_fixer_agent.config import Config
-from bug_fixer_agent.logger import Logger
-from bug_fixer_agent.prompts import Prompts
+from bug_fixer_agent.logger import get_logger
+from bug_fixer_agent.prompts import CodebaseInput, Prompts
+from inspector import get_gitignore_spec, process_directory_to_string
 # Removed imports for FilePatcher and TestRunner
 
+# Hash of the last requirements.txt installed successfully; pip is skipped while it matches
+REQUIREMENTS_MARKER_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bug_fixer_agent", "requirements.sha256")
+
+@dataclass(slots=True)
+class BugResult:
+    """
+    Outcome of processing one bug; collected by run() and rendered by generate_report().
+    """
+    bug_name: str
+    status: str = "initial" # Will be updated
+    error: str = ""
+    generated_code_solution: str = ""
+    ai_suggestions: str = ""
+    fix_summary: Dict = field(default_factory=dict)
+
 class BugFixerRunner:
-    def __init__(self):
-        self.logger = Logger()
+    def __init__(self, use_cache: bool = True, use_batch: bool = False):
+        self.logger = get_logger()
         self.config = Config()
-        self.prompts = Prompts()
-        self.agent = BugFixerAgent(self.config, self.logger, self.prompts)
+        # Disabling the cache forces fresh LLM calls even when the prompt is unchanged
+        self.config.use_cache = self.config.use_cache and use_cache
+        self.config.use_batch = self.config.use_batch or use_batch
+        # One set of bug definitions shared by the prompts and the run loop
+        self.bug_defs = BugDefinitions()
+        self.prompts = Prompts(self.bug_defs, self.config)
+        self.agent = AsyncBugFixerAgent(self.config, self.logger, self.prompts)
         # self.patcher = FilePatcher(self.config, self.logger) # Removed
         # self.code_analyzer = CodeAnalyzer(self.logger) # No longer need a separate instance here
-        self.bug_defs = BugDefinitions() # <-- Re-added this line
+        # Filled in memory by setup_environment; load_codebase_content falls back to codebase_content.txt
+        self.codebase_content = ""
         
         # Results tracking
         self.results = {
@@ -44,31 +75,66 @@ class BugFixerRunner:
             
             # Install agent dependencies
             req_path = os.path.join(os.path.dirname(__file__), "requirements.txt")
-            self.logger.info(f"Installing agent dependencies from {req_path}...")
-            # Use --no-warn-script-location to suppress warnings about scripts not being in PATH
-            subprocess.run([sys.executable, "-m", "pip", "install", "-r", req_path, "--upgrade", "--no-warn-script-location"], 
-                          check=True, capture_output=True)
-            self.logger.info("Agent dependencies installed successfully.")
+            requirements_hash = self._requirements_hash(req_path)
+            if self._read_requirements_marker() == requirements_hash:
+                self.logger.info("Agent dependencies already satisfied; skipping pip install.")
+            else:
+                self.logger.info(f"Installing agent dependencies from {req_path}...")
+                # Use --no-warn-script-location to suppress warnings about scripts not being in PATH
+                subprocess.run([sys.executable, "-m", "pip", "install", "-r", req_path, "--upgrade", "--no-warn-script-location",
+                                "--disable-pip-version-check", "--no-input", "-q"],
+                              check=True, capture_output=True)
+                self._write_requirements_marker(requirements_hash)
+                self.logger.info("Agent dependencies installed successfully.")
             
-            # Inspect codebase to create context file
-            self.logger.info("Inspecting the codebase to create context file ('codebase_content.txt')...")
-            inspector_path = os.path.join(self.config.project_root, "inspector.py")
-            # Ensure the inspector.py is run from the project root directory
-            subprocess.run([sys.executable, inspector_path, "-d", "."], 
-                           check=True, capture_output=True, cwd=self.config.project_root)
+            # Inspect codebase in-process; the context is kept in memory instead of codebase_content.txt
+            self.logger.info("Inspecting the codebase to build the context...")
+            spec = get_gitignore_spec(Path(self.config.project_root), "codebase_content.txt")
+            self.codebase_content = process_directory_to_string(self.config.project_root, spec)
             self.logger.info("Codebase inspection complete.")
             
             return True
             
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             self.logger.error(f"Failed to setup environment: {e}")
             self.logger.error(f"Stdout/Stderr:\n{getattr(e, 'stdout', 'N/A')}\n{getattr(e, 'stderr', 'N/A')}")
             return False
 
+    @staticmethod
+    def _requirements_hash(req_path: str) -> str:
+        """
+        Hashes the requirements file together with the interpreter, so switching
+        virtualenvs triggers a fresh install.
+        """
+        with open(req_path, "rb") as f:
+            digest = hashlib.sha256(f.read())
+        digest.update(sys.executable.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_requirements_marker() -> str:
+        try:
+            with open(REQUIREMENTS_MARKER_PATH, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    def _write_requirements_marker(self, requirements_hash: str):
+        try:
+            os.makedirs(os.path.dirname(REQUIREMENTS_MARKER_PATH), exist_ok=True)
+            with open(REQUIREMENTS_MARKER_PATH, "w", encoding="utf-8") as f:
+                f.write(requirements_hash)
+        except OSError as e:
+            self.logger.warning(f"Could not record installed requirements: {e}")
+
     def load_codebase_content(self) -> str:
         """
-        Loads the codebase content from the generated file.
+        Returns the codebase content built by setup_environment, or loads it from the generated file.
         """
+        if self.codebase_content:
+            self.logger.info(f"Using in-memory codebase content ({len(self.codebase_content)} characters)")
+            return self.codebase_content
+
         codebase_content_path = os.path.join(self.config.project_root, "codebase_content.txt")
         
         if not os.path.exists(codebase_content_path):
@@ -76,141 +142,233 @@ class BugFixerRunner:
             return ""
         
         try:
-            with open(codebase_content_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            self.logger.info(f"Loaded codebase content ({len(content)} characters)")
+            size = os.path.getsize(codebase_content_path)
+            if size == 0:
+                self.logger.info("Loaded codebase content (0 bytes)")
+                return ""
+            # Decode straight from the mapped file so the raw bytes are never copied into a bytes object
+            with open(codebase_content_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content = str(mapped, "utf-8")
+            if "\r" in content:
+                # Match text-mode reads, which normalize line endings
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+            self.logger.info(f"Loaded codebase content ({size} bytes)")
             return content
         except Exception as e:
             self.logger.error(f"Error loading codebase content: {e}")
             return ""
 
-    def process_bug(self, bug: Dict, codebase_content: str) -> Dict:
+    async def process_bug(self, bug: Bug, codebase_content: CodebaseInput) -> BugResult:
         """
         Processes a single bug by generating a code solution.
         """
-        bug_name = bug["name"]
+        bug_name = bug.name
         self.logger.info(f"Processing bug: {bug_name}")
-        
-        result_payload = {
-            "bug_name": bug_name,
-            "status": "initial", # Will be updated
-            "error": "",
-            "generated_code_solution": "", # New field for the generated code
-            "ai_suggestions": "" 
-        }
+        result_payload = BugResult(bug_name)
 
         try:
             # Generate code solution
-            corrected_code_snippet, analysis_metadata = self.agent.generate_fix(bug_name, codebase_content)
-            result_payload["generated_code_solution"] = corrected_code_snippet
-            
-            if not corrected_code_snippet:
-                result_payload["status"] = "failed_to_generate_solution"
-                result_payload["error"] = analysis_metadata.get("error", "No code solution generated.")
-            else:
-                result_payload["status"] = "solution_generated"
-                # For this new mode, "fixed" means a solution was successfully generated.
-                result_payload["fix_summary"] = self.agent.get_fix_summary(bug_name, corrected_code_snippet, analysis_metadata)
-                
+            corrected_code_snippet, analysis_metadata = await self.agent.generate_fix_async(bug_name, codebase_content)
+            self._record_solution(result_payload, corrected_code_snippet, analysis_metadata)
         except Exception as e:
             self.logger.error(f"Error processing bug {bug_name}: {e}")
-            result_payload["status"] = "error"
-            result_payload["error"] = str(e)
+            result_payload.status = "error"
+            result_payload.error = str(e)
 
         # If fix failed for any reason, generate AI-driven suggestions
-        if result_payload["status"] != "solution_generated":
-            suggestion_response = self.agent.generate_failure_analysis_and_suggestions(
+        if result_payload.status != "solution_generated":
+            suggestion_response = await self.agent.generate_failure_analysis_and_suggestions_async(
                 bug_name=bug_name,
-                original_error_message=result_payload["error"],
-                previous_ai_generated_code=result_payload["generated_code_solution"],
+                original_error_message=result_payload.error,
+                previous_ai_generated_code=result_payload.generated_code_solution,
                 codebase_content=codebase_content # Pass full content for broader context
             )
-            if suggestion_response["success"]:
-                result_payload["ai_suggestions"] = suggestion_response["analysis"]
-            else:
-                result_payload["ai_suggestions"] = "Could not generate intelligent suggestions due to API error."
+            self._record_suggestions(result_payload, suggestion_response)
 
         return result_payload
 
-    def generate_report(self, bug_results: List[Dict]) -> str:
+    def process_bug_sync(self, bug: Bug, codebase_content: CodebaseInput) -> BugResult:
+        """
+        Blocking counterpart of `process_bug` using the sync client; safe to run from worker threads.
+        """
+        bug_name = bug.name
+        self.logger.info(f"Processing bug: {bug_name}")
+        result_payload = BugResult(bug_name)
+
+        try:
+            corrected_code_snippet, analysis_metadata = self.agent.generate_fix(bug_name, codebase_content)
+            self._record_solution(result_payload, corrected_code_snippet, analysis_metadata)
+        except Exception as e:
+            self.logger.error(f"Error processing bug {bug_name}: {e}")
+            result_payload.status = "error"
+            result_payload.error = str(e)
+
+        if result_payload.status != "solution_generated":
+            self._suggest_sync(result_payload, codebase_content)
+
+        return result_payload
+
+    def _suggest_sync(self, result_payload: BugResult, codebase_content: CodebaseInput):
+        """
+        Asks the model for a failure analysis of a bug that got no solution, using the sync client.
+        """
+        suggestion_response = self.agent.generate_failure_analysis_and_suggestions(
+            bug_name=result_payload.bug_name,
+            original_error_message=result_payload.error,
+            previous_ai_generated_code=result_payload.generated_code_solution,
+            codebase_content=codebase_content
+        )
+        self._record_suggestions(result_payload, suggestion_response)
+
+    def _record_solution(self, result_payload: BugResult, corrected_code_snippet: str, analysis_metadata: Dict):
+        result_payload.generated_code_solution = corrected_code_snippet
+
+        if not corrected_code_snippet:
+            result_payload.status = "failed_to_generate_solution"
+            result_payload.error = analysis_metadata.get("error", "No code solution generated.")
+        else:
+            result_payload.status = "solution_generated"
+            # For this new mode, "fixed" means a solution was successfully generated.
+            result_payload.fix_summary = self.agent.get_fix_summary(result_payload.bug_name, corrected_code_snippet, analysis_metadata)
+
+    @staticmethod
+    def _record_suggestions(result_payload: BugResult, suggestion_response: Dict):
+        if suggestion_response.get("success"):
+            result_payload.ai_suggestions = suggestion_response["analysis"]
+        else:
+            result_payload.ai_suggestions = "Could not generate intelligent suggestions due to API error."
+
+    async def _run_async(self, bugs: List[Bug], codebase_content: CodebaseInput) -> List[BugResult]:
+        """
+        Processes all bugs concurrently. API calls are bounded by the agent's own semaphore and
+        rate limiter, so no extra limit is applied here. Results come back in the same order as `bugs`.
+        """
+        tasks = [self.process_bug(bug, codebase_content) for bug in bugs]
+        try:
+            return await async_tqdm.gather(*tasks, desc="Generating Solutions")
+        finally:
+            # The async HTTP client's connections belong to this loop, so close it before the loop ends
+            await self.agent.aclose()
+
+    def _run_threaded(self, bugs: List[Bug], codebase_content: CodebaseInput) -> List[BugResult]:
+        """
+        Fans bugs out over a thread pool; the sync client releases the GIL while waiting on HTTP.
+        Results are collected on the calling thread and returned in the same order as `bugs`.
+        """
+        bug_results: List[BugResult] = [None] * len(bugs)
+        with ThreadPoolExecutor(max_workers=self.config.max_workers or 4) as executor:
+            futures = {executor.submit(self.process_bug_sync, bug, codebase_content): i for i, bug in enumerate(bugs)}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Generating Solutions"):
+                bug_results[futures[future]] = future.result()
+        return bug_results
+
+    def _run_batched(self, bugs: List[Bug], codebase_content: CodebaseInput) -> List[BugResult]:
         """
-        Generates a comprehensive bug fix report.
+        Packs up to `max_batch_size` bugs into each request via `generate_fixes_batch`,
+        then collects failure suggestions for the bugs left without a solution.
+        Results are returned in the same order as `bugs`.
+        """
+        fixes = self.agent.generate_fixes_batch([bug.name for bug in bugs], codebase_content)
+        bug_results: List[BugResult] = []
+        for bug in tqdm(bugs, desc="Recording Solutions"):
+            result_payload = BugResult(bug.name)
+            corrected_code_snippet, analysis_metadata = fixes[bug.name]
+            self._record_solution(result_payload, corrected_code_snippet, analysis_metadata)
+            if result_payload.status != "solution_generated":
+                self._suggest_sync(result_payload, codebase_content)
+            bug_results.append(result_payload)
+        return bug_results
+
+    def generate_report(self, bug_results: List[BugResult], out: TextIO):
         """
-        report_lines = []
-        report_lines.append("=" * 60)
-        report_lines.append("BUG FIXER AGENT REPORT")
-        report_lines.append("=" * 60)
-        report_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Model Used: {self.config.model_name}")
-        report_lines.append(f"Total Bugs Processed: {len(bug_results)}")
-        report_lines.append("")
+        Generates a comprehensive bug fix report, writing it line by line to `out`.
+        """
+        write = out.write
+
+        def line(text: str):
+            write(text)
+            write("\n")
+
+        line("=" * 60)
+        line("BUG FIXER AGENT REPORT")
+        line("=" * 60)
+        line(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        line(f"Model Used: {self.config.model_name}")
+        line(f"Total Bugs Processed: {len(bug_results)}")
+        line("")
         
         # Summary statistics
-        solution_generated_count = sum(1 for r in bug_results if r["status"] == "solution_generated")
+        solution_generated_count = sum(1 for r in bug_results if r.status == "solution_generated")
         failed_count = len(bug_results) - solution_generated_count
         
-        report_lines.append("SUMMARY:")
-        report_lines.append(f"- Solutions Successfully Generated: {solution_generated_count}")
-        report_lines.append(f"- Failures (No Solution/Invalid Solution): {failed_count}")
-        report_lines.append(f"- Success Rate (Solution Generation): {(solution_generated_count/len(bug_results)*100):.1f}%")
-        report_lines.append("")
+        line("SUMMARY:")
+        line(f"- Solutions Successfully Generated: {solution_generated_count}")
+        line(f"- Failures (No Solution/Invalid Solution): {failed_count}")
+        line(f"- Success Rate (Solution Generation): {(solution_generated_count/len(bug_results)*100):.1f}%")
+        line("")
         
         # Detailed results for each bug
         for i, result in enumerate(bug_results, 1):
-            report_lines.append(f"BUG {i}: {result['bug_name']}")
-            report_lines.append(f"Status: {result['status'].upper()}")
-            report_lines.append("-" * 40)
+            line(f"BUG {i}: {result.bug_name}")
+            line(f"Status: {result.status.upper()}")
+            line("-" * 40)
             
-            if result["status"] == "solution_generated":
-                fix_summary = result.get("fix_summary", {})
-                report_lines.append(f"Root Cause: {fix_summary.get('root_cause', 'Not specified')}")
-                report_lines.append(f"Proposed Fix Concept: {fix_summary.get('fix_summary', 'Not specified')}")
-                report_lines.append(f"Files Affected: {', '.join(fix_summary.get('files_affected', []))}")
-                report_lines.append("\n--- GENERATED CODE SOLUTION ---")
-                report_lines.append(result["generated_code_solution"])
-                report_lines.append("-------------------------------")
+            if result.status == "solution_generated":
+                fix_summary = result.fix_summary
+                line(f"Root Cause: {fix_summary.get('root_cause', 'Not specified')}")
+                line(f"Proposed Fix Concept: {fix_summary.get('fix_summary', 'Not specified')}")
+                line(f"Files Affected: {', '.join(fix_summary.get('files_affected', []))}")
+                line("\n--- GENERATED CODE SOLUTION ---")
+                line(result.generated_code_solution)
+                line("-------------------------------")
 
             else: # If status is failed_to_generate_solution or error
-                report_lines.append(f"Error: {result.get('error', 'Unknown error')}")
-                if "generated_code_solution" in result and result["generated_code_solution"]:
-                    report_lines.append("\n--- ATTEMPTED CODE SOLUTION ---")
-                    report_lines.append(result["generated_code_solution"])
-                    report_lines.append("-------------------------------")
+                line(f"Error: {result.error or 'Unknown error'}")
+                if result.generated_code_solution:
+                    line("\n--- ATTEMPTED CODE SOLUTION ---")
+                    line(result.generated_code_solution)
+                    line("-------------------------------")
                 else:
-                    report_lines.append("\nNo code solution was generated in the initial attempt.")
+                    line("\nNo code solution was generated in the initial attempt.")
 
                 # Display AI-generated suggestions (which should contain the improved code)
-                if result.get("ai_suggestions"):
-                    report_lines.append("\n--- AI-GENERATED FAILURE ANALYSIS AND IMPROVED SOLUTION ---")
-                    report_lines.append(result["ai_suggestions"])
-                    report_lines.append("---------------------------------------------------------")
+                if result.ai_suggestions:
+                    line("\n--- AI-GENERATED FAILURE ANALYSIS AND IMPROVED SOLUTION ---")
+                    line(result.ai_suggestions)
+                    line("---------------------------------------------------------")
                 else:
-                    report_lines.append("\nNo specific AI-generated suggestions available for this failure.")
+                    line("\nNo specific AI-generated suggestions available for this failure.")
 
-            report_lines.append("")
+            line("")
         
         # Technical details
-        report_lines.append("TECHNICAL DETAILS:")
-        report_lines.append(f"- Model: {self.config.model_name}")
-        report_lines.append(f"- Temperature: {self.config.temperature}")
-        report_lines.append(f"- Max Output Tokens: {self.config.max_output_tokens}")
-        report_lines.append(f"- Max Retries: {self.config.max_retries}")
-        report_lines.append("")
+        line("TECHNICAL DETAILS:")
+        line(f"- Model: {self.config.model_name}")
+        line(f"- Temperature: {self.config.temperature}")
+        line(f"- Max Output Tokens: {self.config.max_output_tokens}")
+        line(f"- Max Retries: {self.config.max_retries}")
+        line("")
         
         # General recommendations (these are still hardcoded, as they are system-level suggestions)
-        report_lines.append("GENERAL RECOMMENDATIONS:")
+        line("GENERAL RECOMMENDATIONS:")
         if failed_count > 0:
-            report_lines.append("- Review the 'AI-GENERATED FAILURE ANALYSIS AND IMPROVED SOLUTION' for failed bugs.")
-            report_lines.append("- Ensure the environment is correctly set up and dependencies are met.")
-            report_lines.append("- Consult agent logs for further details on API errors.")
-            report_lines.append("- Refine bug definitions or prompt hints if solutions are consistently incorrect.")
+            line("- Review the 'AI-GENERATED FAILURE ANALYSIS AND IMPROVED SOLUTION' for failed bugs.")
+            line("- Ensure the environment is correctly set up and dependencies are met.")
+            line("- Consult agent logs for further details on API errors.")
+            line("- Refine bug definitions or prompt hints if solutions are consistently incorrect.")
         else:
-            report_lines.append("- All bug solutions successfully generated! Review them for accuracy.")
-            report_lines.append("- Manually apply the generated code snippets to your codebase.")
-            report_lines.append("- Thoroughly test the application after applying changes.")
-            report_lines.append("- Consider a code review for quality assurance before deploying.")
-        
-        return "\n".join(report_lines)
+            line("- All bug solutions successfully generated! Review them for accuracy.")
+            line("- Manually apply the generated code snippets to your codebase.")
+            line("- Thoroughly test the application after applying changes.")
+            line("- Consider a code review for quality assurance before deploying.")
+
+    def generate_report_string(self, bug_results: List[BugResult]) -> str:
+        """
+        Returns the report as a string, for callers that don't write it to a file.
+        """
+        buffer = io.StringIO()
+        self.generate_report(bug_results, out=buffer)
+        return buffer.getvalue()
 
     def run(self) -> bool:
         """
@@ -234,31 +392,40 @@ class BugFixerRunner:
         bugs_to_fix = self.bug_defs.get_all_bugs()
         self.logger.info(f"Starting to process {len(bugs_to_fix)} planted bugs...")
         
-        # Process each bug
-        bug_results = []
-        for bug in tqdm(bugs_to_fix, desc="Generating Solutions"):
-            bug_name = bug["name"]
-            tqdm.write(f"\n--- Processing: {bug_name} ---")
-            
-            result = self.process_bug(bug, codebase_content)
-            bug_results.append(result)
-            
+        # Index the content once; every bug's prompt reuses the per-file split
+        codebase_context = self.agent.prepare_context(codebase_content)
+
+        # Process bugs concurrently; statistics are accumulated once every bug has finished
+        try:
+            if self.config.use_batch:
+                bug_results = self._run_batched(bugs_to_fix, codebase_context)
+            elif self.config.use_async:
+                bug_results = asyncio.run(self._run_async(bugs_to_fix, codebase_context))
+            else:
+                bug_results = self._run_threaded(bugs_to_fix, codebase_context)
+        finally:
+            # Persist the analyzer cache once for the whole run
+            self.agent.close()
+        for result in bug_results:
+            tqdm.write(f"\n--- Processed: {result.bug_name} ---")
+
             # Update statistics
             self.results["bugs_processed"] += 1
-            if result["status"] == "solution_generated":
+            if result.status == "solution_generated":
                 self.results["bugs_fixed"] += 1 # Accumulate successful generations
             else:
                 self.results["bugs_failed"] += 1
+            self.results["solutions"].append(asdict(result))
             
             # Print immediate status
-            status = result["status"].upper()
+            status = result.status.upper()
             tqdm.write(f"Status: {status}")
             
-            if result["status"] == "solution_generated":
+            if result.status == "solution_generated":
                 tqdm.write("Successfully generated a code solution.")
             else:
-                tqdm.write(f"Generation failed. Error: {result.get('error', 'Unknown error')}")
-                if result.get("ai_suggestions"):
+                tqdm.write(f"Generation failed. Error: {result.error or 'Unknown error'}")
+                if result.ai_suggestions:
                     tqdm.write("AI-Generated Analysis & Suggestions provided in report.")
         
         # Calculate total time
@@ -266,11 +433,9 @@ class BugFixerRunner:
         self.results["total_time"] = (end_time - start_time).total_seconds()
         
         # Generate and save report
-        report_content = self.generate_report(bug_results)
         report_path = os.path.join(self.config.project_root, "bug_fix_report.txt")
-        
         with open(report_path, "w", encoding="utf-8") as f:
-            f.write(report_content)
+            self.generate_report(bug_results, out=f)
         
         self.logger.info(f"Bug solution generation process complete. Report saved to '{report_path}'.")
         self.logger.info(f"Total time: {self.results['total_time']:.2f} seconds")
@@ -286,7 +451,20 @@ class BugFixerRunner:
 
 def main():
     """Main execution script for the Bug Fixer Agent."""
-    runner = BugFixerRunner()
+    parser = argparse.ArgumentParser(description="Generates code solutions for the planted bugs.")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached fixes and call the model for every bug.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send up to max_batch_size bugs in each model request.",
+    )
+    args = parser.parse_args()
+
+    runner = BugFixerRunner(use_cache=not args.no_cache, use_batch=args.batch)
     success = runner.run()
     
     if success:
@@ -1,13 +1,98 @@
-from bug_fixer_agent.bug_definitions import BugDefinitions
+import functools
+import mmap
+from typing import Dict, List, Optional, Tuple, Union
+
+from bug_fixer_agent.bug_definitions import Bug, BugDefinitions
+
+# Optional: pyahocorasick matches every pattern in a single pass over the content
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Bug tuples are hashable, so pattern tables are built once per set of definitions and reused across detectors
+@functools.lru_cache(maxsize=8)
+def _pattern_bugs(bugs: Tuple[Bug, ...]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Maps each pattern to the names of the bugs that use it.
+    """
+    pattern_bugs: Dict[str, List[str]] = {}
+    for bug in bugs:
+        for pattern in bug.patterns:
+            pattern_bugs.setdefault(pattern, []).append(bug.name)
+    return tuple((pattern, tuple(bug_names)) for pattern, bug_names in pattern_bugs.items())
+
+
+@functools.lru_cache(maxsize=8)
+def _build_matcher(bugs: Tuple[Bug, ...]):
+    """
+    Returns an Aho-Corasick automaton mapping each pattern to the bug names that use it,
+    or the plain (pattern, bug_names) pairs when pyahocorasick is not installed.
+    """
+    pattern_bugs = _pattern_bugs(bugs)
+    if ahocorasick is None:
+        return pattern_bugs
+
+    automaton = ahocorasick.Automaton()
+    for pattern, bug_names in pattern_bugs:
+        automaton.add_word(pattern, bug_names)
+    if pattern_bugs:
+        automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=8)
+def _byte_patterns(bugs: Tuple[Bug, ...]) -> Tuple[Tuple[bytes, Tuple[str, ...]], ...]:
+    """
+    UTF-8 encoded patterns, for searching undecoded content such as an mmap of codebase_content.txt.
+    """
+    return tuple((pattern.encode("utf-8"), bug_names) for pattern, bug_names in _pattern_bugs(bugs))
+
 
 class BugDetector:
-    def __init__(self):
-        self.bug_defs = BugDefinitions()
+    def __init__(self, bug_defs: Optional[BugDefinitions] = None):
+        self.bug_defs = bug_defs or BugDefinitions()
+        self._matcher = _build_matcher(self.bug_defs.get_all_bugs())
+        self._byte_patterns = _byte_patterns(self.bug_defs.get_all_bugs())
+
+    def _matched_bug_names(self, codebase_content: str) -> set:
+        matched = set()
+        if isinstance(self._matcher, tuple):
+            for pattern, bug_names in self._matcher:
+                if pattern in codebase_content:
+                    matched.update(bug_names)
+        elif len(self._matcher):
+            for _, bug_names in self._matcher.iter(codebase_content):
+                matched.update(bug_names)
+        return matched
+
+    def _matched_bug_names_bytes(self, codebase_content: Union[bytes, bytearray, mmap.mmap]) -> set:
+        matched = set()
+        for pattern, bug_names in self._byte_patterns:
+            # Skip the scan when every bug using this pattern has already matched
+            if not matched.issuperset(bug_names) and codebase_content.find(pattern) != -1:
+                matched.update(bug_names)
+        return matched
 
     def detect_bugs(self, codebase_content):
-        bugs = []
-        for bug in self.bug_defs.get_all_bugs():
-            bug_full_name = f"{bug['name']}: {bug['description']}"
-            if any(pattern in codebase_content for pattern in bug['patterns']):
-                bugs.append(bug_full_name)
-        return bugs
\ No newline at end of file
+        """
+        Accepts the codebase content as a str, or as bytes/mmap to search without decoding it.
+        """
+        if isinstance(codebase_content, str):
+            matched = self._matched_bug_names(codebase_content)
+        else:
+            matched = self._matched_bug_names_bytes(codebase_content)
+        return [f"{bug.name}: {bug.description}" for bug in self.bug_defs.get_all_bugs() if bug.name in matched]
+
+    def detect_bugs_in_file(self, file_path: str) -> List[str]:
+        """
+        Memory-maps a generated context file (e.g. codebase_content.txt) and searches its raw bytes.
+        """
+        with open(file_path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    return self.detect_bugs(content)
+            except ValueError:
+                # Empty files cannot be mapped
+                return []
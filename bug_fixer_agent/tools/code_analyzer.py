@@ -2,21 +2,138 @@
 import os
 import ast
 import re
-from typing import Dict, List
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+from bug_fixer_agent.cache import _dumps, _loads
 from bug_fixer_agent.logger import Logger
 
+# TypeScript/JavaScript patterns, compiled once at import instead of on every file
+_IMPORT_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'import\s+{([^}]+)}\s+from\s+[\'"]([^\'"]+)[\'"]',
+    r'import\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]',
+    r'import\s+[\'"]([^\'"]+)[\'"]'
+))
+_FUNCTION_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'function\s+(\w+)\s*\(',
+    r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>',
+    r'(\w+)\s*:\s*React\.FC',
+    r'export\s+(?:default\s+)?(?:function\s+)?(\w+)'
+))
+_COMPONENT_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'function\s+(\w+)\s*\([^)]*\)\s*{',
+    r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>\s*{',
+    r'export\s+default\s+function\s+(\w+)'
+))
+# Every byte except the bracket characters, so one translate() pass strips the rest of the file
+_NON_BRACKET_BYTES = bytes(b for b in range(256) if b not in b'{}()[]')
+
+# Bump the version when the analysis result format changes so stale caches are ignored.
+# JSON rather than pickle: the cache lives inside the analyzed project, and loading it must not run code.
+_CACHE_FILENAME = "analyzer_v3.json"
+
+class _PyCollector(ast.NodeVisitor):
+    """
+    Collects imports, function and class names. Function bodies are not descended into,
+    so local imports and nested functions are skipped; class bodies are, so methods are kept.
+    """
+    def __init__(self):
+        self.imports: List[str] = []
+        self.functions: List[str] = []
+        self.classes: List[str] = []
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        for alias in node.names:
+            self.imports.append(f"{module}.{alias.name}")
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions.append(node.name)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self.functions.append(node.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.append(node.name)
+        self.generic_visit(node)
+
 class CodeAnalyzer:
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, cache_dir: Optional[str] = None):
         self.logger = logger
+        # path -> (mtime_ns, size, analysis); persisted to cache_dir when one is given
+        self._cache: Dict[str, Tuple[int, int, Dict]] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_path = os.path.join(cache_dir, _CACHE_FILENAME) if cache_dir else None
+        # Set when the in-memory cache has entries not yet written by save_cache()
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self._cache_path or not os.path.exists(self._cache_path):
+            return
+        try:
+            with open(self._cache_path, 'rb') as f:
+                entries = _loads(f.read())
+            self._cache = {
+                path: (int(mtime_ns), int(size), analysis)
+                for path, (mtime_ns, size, analysis) in entries.items()
+                if isinstance(analysis, dict)
+            }
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable analyzer cache {self._cache_path}: {e}")
+
+    def save_cache(self):
+        """
+        Writes the cache atomically if it changed since it was loaded. Call once at the end of a run.
+        """
+        if not self._cache_path:
+            return
+        with self._cache_lock:
+            if not self._dirty:
+                return
+            data = _dumps(self._cache)
+            self._dirty = False
+        try:
+            cache_dir = os.path.dirname(self._cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not persist analyzer cache: {e}")
 
     def analyze_file(self, file_path: str) -> Dict:
         """
         Performs static analysis on a file to extract useful information.
+        Results are reused while the file's mtime and size are unchanged; across runs once `save_cache` has run.
         """
         try:
-            if not os.path.exists(file_path):
-                return {"error": f"File {file_path} does not exist"}
-            
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return {"error": f"File {file_path} does not exist"}
+        except OSError as e:
+            self.logger.error(f"Error analyzing file {file_path}: {e}")
+            return {"error": str(e)}
+
+        with self._cache_lock:
+            cached = self._cache.get(file_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        result = self._analyze_uncached(file_path)
+        if "error" not in result:
+            with self._cache_lock:
+                self._cache[file_path] = (st.st_mtime_ns, st.st_size, result)
+                self._dirty = True
+        return result
+
+    def _analyze_uncached(self, file_path: str) -> Dict:
+        try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
@@ -33,6 +150,39 @@ class CodeAnalyzer:
             self.logger.error(f"Error analyzing file {file_path}: {e}")
             return {"error": str(e)}
 
+    def extract_region(self, file_path: str, keywords: List[str], pad: int = 40) -> str:
+        """
+        Returns the lines of a file that mention any of the keywords, with `pad` lines of
+        context around each hit. Overlapping regions are merged and skipped lines are marked
+        with "...". Falls back to the whole file when no keyword matches.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+
+        hits = [i for i, line in enumerate(lines) if any(keyword in line for keyword in keywords)]
+        if not hits:
+            self.logger.warning(f"No bug keywords found in {file_path}; using the whole file as context")
+            return '\n'.join(lines)
+
+        regions = []
+        for i in hits:
+            start, end = max(0, i - pad), min(len(lines), i + pad + 1)
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
+            else:
+                regions.append([start, end])
+
+        region_lines = []
+        previous_end = 0
+        for start, end in regions:
+            if start > previous_end:
+                region_lines.append('...')
+            region_lines.extend(lines[start:end])
+            previous_end = end
+        if previous_end < len(lines):
+            region_lines.append('...')
+        return '\n'.join(region_lines)
+
     def _analyze_python_file(self, content: str, file_path: str) -> Dict:
         """
         Analyzes Python files for imports, functions, classes, and syntax errors.
@@ -48,20 +198,13 @@ class CodeAnalyzer:
         
         try:
             tree = ast.parse(content)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        result["imports"].append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for alias in node.names:
-                        result["imports"].append(f"{module}.{alias.name}")
-                elif isinstance(node, ast.FunctionDef):
-                    result["functions"].append(node.name)
-                elif isinstance(node, ast.ClassDef):
-                    result["classes"].append(node.name)
-                    
+
+            collector = _PyCollector()
+            collector.visit(tree)
+            result["imports"] = collector.imports
+            result["functions"] = collector.functions
+            result["classes"] = collector.classes
+
         except SyntaxError as e:
             result["syntax_errors"].append(f"Syntax error at line {e.lineno}: {e.msg}")
         except Exception as e:
@@ -84,14 +227,8 @@ class CodeAnalyzer:
         
         try:
             # Extract imports using regex
-            import_patterns = [
-                r'import\s+{([^}]+)}\s+from\s+[\'"]([^\'"]+)[\'"]',
-                r'import\s+(\w+)\s+from\s+[\'"]([^\'"]+)[\'"]',
-                r'import\s+[\'"]([^\'"]+)[\'"]'
-            ]
-            
-            for pattern in import_patterns:
-                matches = re.findall(pattern, content)
+            for pattern in _IMPORT_PATTERNS:
+                matches = pattern.findall(content)
                 for match in matches:
                     if isinstance(match, tuple):
                         result["imports"].extend([m.strip() for m in match[0].split(',')])
@@ -99,26 +236,13 @@ class CodeAnalyzer:
                         result["imports"].append(match)
             
             # Extract function names
-            function_patterns = [
-                r'function\s+(\w+)\s*\(',
-                r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>',
-                r'(\w+)\s*:\s*React\.FC',
-                r'export\s+(?:default\s+)?(?:function\s+)?(\w+)'
-            ]
-            
-            for pattern in function_patterns:
-                matches = re.findall(pattern, content)
+            for pattern in _FUNCTION_PATTERNS:
+                matches = pattern.findall(content)
                 result["functions"].extend(matches)
             
             # Extract React components
-            component_patterns = [
-                r'function\s+(\w+)\s*\([^)]*\)\s*{',
-                r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>\s*{',
-                r'export\s+default\s+function\s+(\w+)'
-            ]
-            
-            for pattern in component_patterns:
-                matches = re.findall(pattern, content)
+            for pattern in _COMPONENT_PATTERNS:
+                matches = pattern.findall(content)
                 result["components"].extend(matches)
             
             # Basic syntax validation
@@ -134,10 +258,13 @@ class CodeAnalyzer:
         """
         Basic TypeScript syntax validation.
         """
-        # Check for balanced braces and parentheses
-        brace_count = content.count('{') - content.count('}')
-        paren_count = content.count('(') - content.count(')')
-        bracket_count = content.count('[') - content.count(']')
+        # Check for balanced braces and parentheses. The content is scanned once to keep only
+        # bracket bytes (UTF-8 continuation bytes never collide with ASCII), then the much
+        # smaller result is counted.
+        brackets = content.encode('utf-8', errors='ignore').translate(None, _NON_BRACKET_BYTES)
+        brace_count = brackets.count(b'{') - brackets.count(b'}')
+        paren_count = brackets.count(b'(') - brackets.count(b')')
+        bracket_count = brackets.count(b'[') - brackets.count(b']')
         
         return brace_count == 0 and paren_count == 0 and bracket_count == 0
 
@@ -1,13 +1,19 @@
+import os
+from typing import Optional
+
 from bug_fixer_agent.config import Config
 
+# A patch is only applied when it touches one of the project's source trees
+_PATCH_ROOTS = ("backend/", "frontend/")
+
 class FixApplier:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or Config()
+        self.content_path = os.path.join(self.config.project_root, "codebase_content.txt")
 
     def apply_fix(self, fix_patch):
-        with open("codebase_content.txt", "r") as f:
-            content = f.read()
-        if fix_patch and any(path in fix_patch for path in ["backend/", "frontend/"]):
-            with open("codebase_content.txt", "w") as f:
-                f.write(content + "\n" + fix_patch)
-        return True
\ No newline at end of file
+        # Appending keeps each patch O(len(patch)) instead of rewriting the whole file
+        if fix_patch and any(path in fix_patch for path in _PATCH_ROOTS):
+            with open(self.content_path, "a", encoding="utf-8") as f:
+                f.write("\n" + fix_patch)
+        return True
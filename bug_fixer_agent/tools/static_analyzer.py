@@ -1,17 +1,24 @@
-import subprocess
-import os
-from bug_fixer_agent.config import Config
+import io
 
-class StaticAnalyzer:
-    def __init__(self):
-        self.config = Config()
+# pyflakes runs in-process; without it only a syntax check is possible
+try:
+    from pyflakes.api import check as pyflakes_check
+    from pyflakes.reporter import Reporter
+except ImportError:
+    pyflakes_check = None
 
+class StaticAnalyzer:
     def analyze(self, codebase_content):
+        """
+        Returns True when the code has no pyflakes warnings (or, without pyflakes, compiles).
+        The code is checked in memory, so concurrent calls don't share a temp file.
+        """
         try:
-            with open("temp_code.py", "w") as f:
-                f.write(codebase_content)
-            result = subprocess.run([self.config.static_analysis_tools["python"], "temp_code.py"], capture_output=True, text=True)
-            os.remove("temp_code.py")
-            return result.returncode == 0
+            if pyflakes_check is None:
+                compile(codebase_content, "<codebase_content>", "exec")
+                return True
+            buffer = io.StringIO()
+            warning_count = pyflakes_check(codebase_content, "<codebase_content>", Reporter(buffer, buffer))
+            return warning_count == 0
         except Exception:
-            return False
\ No newline at end of file
+            return False
@@ -1,13 +1,31 @@
 # inspector.py (Updated to ignore itself and agent files more broadly)
 import os
 import argparse
+import collections
+import re
+import codecs
+import io
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 import pathspec
 
 # --- Constants for styling the output ---
 HEADER_LINE = "*" * 100
 FILE_SEPARATOR = "\n\n"
 
+# Files are copied in fixed-size chunks so memory use doesn't grow with file size
+SNIFF_SIZE = 4096
+COPY_CHUNK_SIZE = 64 * 1024
+# Files above this size are streamed from the main thread instead of read whole on the pool
+STREAM_THRESHOLD_BYTES = 1024 * 1024
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# At most this many reads are queued or held ahead of the writer, so memory doesn't grow with the tree
+READ_WINDOW = 2 * READ_WORKERS
+# Files are read with plain blocking reads on the pool. Readahead hints (posix_fadvise, io_uring)
+# were not adopted: with a warm page cache, the common case, they only add an extra open() per file.
+
 # --- Default patterns to ALWAYS ignore, in addition to .gitignore ---
 # This provides a robust baseline for any project.
 DEFAULT_IGNORE_PATTERNS = [
@@ -30,6 +48,7 @@ DEFAULT_IGNORE_PATTERNS = [
     "yarn.lock",
     ".pytest_cache/",
     ".ruff_cache/",
+    ".bugfixer_cache/",
     "bug_fixer_agent/",
     "BOT_REQUIREMENTS.md",
     ".pre-commit-config.yml",
@@ -37,12 +56,10 @@ DEFAULT_IGNORE_PATTERNS = [
     "inspector.py",
     "README.md",
     "pyproject.toml",
-    "uv.lock",
     ".cz.toml",
     "requirements.txt",
     # Markdown and other supported script (do not ignore if they are project docs like BOT_REQUIREMENTS.md)
     # "README.md", # Keep README as it might contain setup instructions
-    "inspector.py", # Add inspector.py itself to ignore
     "bug_fix_report.txt", # Add report file to ignore
     "codebase_content.txt", # Add generated context file to ignore
 
@@ -54,8 +71,6 @@ DEFAULT_IGNORE_PATTERNS = [
     ".vscode/",
     ".idea/",
     
-    # Exclude the entire bug_fixer_agent directory and its content
-    "bug_fixer_agent/", 
     "node_modules/", # Common for frontend
     "db.sqlite3", # Django default DB
 
@@ -78,10 +93,192 @@ def get_gitignore_spec(
 
     # Combine default patterns with project-specific .gitignore patterns
     # Ensure the script's own output file is ignored.
-    all_patterns = DEFAULT_IGNORE_PATTERNS + [output_filename] + project_patterns
+    # Duplicates are dropped so the matcher doesn't test the same pattern twice
+    all_patterns = list(dict.fromkeys(DEFAULT_IGNORE_PATTERNS + [output_filename] + project_patterns))
     return pathspec.PathSpec.from_lines("gitwildmatch", all_patterns)
 
 
+# Opening of a named group, e.g. "(?P<ps_d>"
+_NAMED_GROUP_RE = re.compile(r"\(\?P<\w+>")
+
+
+def compile_ignore_matcher(spec: pathspec.PathSpec) -> Callable[[str], bool]:
+    """
+    Returns a function equivalent to spec.match_file that tests all patterns with one
+    combined regex instead of one regex per pattern. Falls back to spec.match_file when
+    the spec has negated ("!") patterns, since those depend on pattern order.
+    """
+    patterns = [pattern for pattern in spec.patterns if pattern.include is not None]
+    default_flags = re.compile("").flags
+    if any(
+        not pattern.include
+        or not hasattr(pattern, "regex")
+        or pattern.regex.flags != default_flags
+        for pattern in patterns
+    ):
+        return spec.match_file
+    if not patterns:
+        return lambda path: False
+
+    # pathspec names a group in every pattern; the names would clash in the union.
+    # The group names are pathspec internals, so any regex that still fails to combine
+    # falls back to the per-pattern matcher instead of aborting the inspection.
+    try:
+        union = re.compile("|".join(
+            f"(?:{_NAMED_GROUP_RE.sub('(?:', pattern.regex.pattern)})" for pattern in patterns
+        ))
+    except re.error:
+        return spec.match_file
+    return lambda path: union.match(path) is not None
+
+
+def _read_safely(full_file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Reads a file for process_directory; safe to call from worker threads.
+    Returns (text, None) on success, (None, "binary") or (None, <error message>) when
+    the file is skipped, and (None, None) for files too large to hold in memory,
+    which the caller streams instead.
+    """
+    try:
+        with open(full_file_path, "rb") as infile:
+            # Reject binary files from the first block: a NUL byte or invalid UTF-8
+            # aborts before the rest of the file is read
+            sniff = infile.read(SNIFF_SIZE)
+            if b"\0" in sniff:
+                return None, "binary"
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+            parts = [decoder.decode(sniff)]
+
+            if os.fstat(infile.fileno()).st_size > STREAM_THRESHOLD_BYTES:
+                return None, None
+
+            for chunk in iter(lambda: infile.read(COPY_CHUNK_SIZE), b""):
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b"", final=True))
+
+        content = "".join(parts)
+        if "\r" in content:
+            # Match text-mode reads, which normalize line endings
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content, None
+    except UnicodeDecodeError:
+        return None, "binary"
+    except Exception as e:
+        return None, str(e)
+
+
+def _write_header(outfile, relative_file_path_str: str):
+    outfile.write(f"{HEADER_LINE}\n")
+    outfile.write(f"File: {relative_file_path_str}\n")
+    outfile.write(f"{HEADER_LINE}\n\n")
+
+
+def _write_streamed(outfile, full_file_path: Path, relative_file_path_str: str):
+    """
+    Copies a large file into the output in fixed-size chunks.
+    """
+    with open(full_file_path, "r", encoding="utf-8") as infile:
+        # Decode the first block up front so most binary files
+        # are skipped before anything is written
+        sniff = infile.read(SNIFF_SIZE)
+
+        entry_start = outfile.tell()
+        _write_header(outfile, relative_file_path_str)
+        outfile.write(sniff)
+        try:
+            shutil.copyfileobj(infile, outfile, COPY_CHUNK_SIZE)
+        except UnicodeDecodeError:
+            # Binary data after the sniffed block; drop the partial entry
+            outfile.seek(entry_start)
+            outfile.truncate()
+            raise
+    outfile.write(FILE_SEPARATOR)
+
+
+def _read_ahead(
+    executor: ThreadPoolExecutor, paths: Iterable[Path]
+) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    """
+    Yields `_read_safely` results for `paths` in order, with at most READ_WINDOW
+    reads submitted and not yet consumed at any time.
+    """
+    pending = collections.deque()
+    for path in paths:
+        if len(pending) >= READ_WINDOW:
+            yield pending.popleft().result()
+        pending.append(executor.submit(_read_safely, path))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _write_directory(
+    root_path: Path, outfile, spec: pathspec.PathSpec, verbose: bool = True
+) -> int:
+    """
+    Walks through the directory, reads non-ignored files, and writes their
+    content to `outfile`. Returns the number of files added.
+    Files are read on a thread pool to overlap I/O waits; the output is still
+    written in walk order from this thread.
+    """
+    files_processed = 0
+    is_ignored = compile_ignore_matcher(spec)
+    files_to_read: List[Tuple[str, Path]] = []
+    for dirpath, dirnames, filenames in os.walk(root_path, topdown=True):
+        # Relative paths are built by string concatenation from one relpath per directory
+        rel_dir = os.path.relpath(dirpath, root_path).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+
+        # Filter out ignored directories so os.walk doesn't descend into them
+        # Must modify dirnames in place
+        dirnames[:] = [d for d in dirnames if not is_ignored(f"{prefix}{d}/")]
+
+        for filename in filenames:
+            relative_file_path_str = f"{prefix}{filename}"
+
+            if not is_ignored(relative_file_path_str):
+                files_to_read.append((relative_file_path_str, Path(dirpath, filename)))
+
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        read_results = _read_ahead(executor, (full_path for _, full_path in files_to_read))
+
+        for (relative_file_path_str, full_file_path), (content, skip_reason) in zip(files_to_read, read_results):
+            if skip_reason == "binary":
+                if verbose:
+                    print(
+                        f"  [!] Skipped (binary file): {relative_file_path_str}"
+                    )
+                continue
+            if skip_reason:
+                print(
+                    f"  [!] Error reading {relative_file_path_str}: {skip_reason}"
+                )
+                continue
+
+            try:
+                if content is None:
+                    _write_streamed(outfile, full_file_path, relative_file_path_str)
+                else:
+                    _write_header(outfile, relative_file_path_str)
+                    outfile.write(content)
+                    outfile.write(FILE_SEPARATOR)
+
+                if verbose:
+                    print(f"  [+] Added: {relative_file_path_str}")
+                files_processed += 1
+
+            except UnicodeDecodeError:
+                if verbose:
+                    print(
+                        f"  [!] Skipped (binary file): {relative_file_path_str}"
+                    )
+            except Exception as e:
+                print(
+                    f"  [!] Error reading {relative_file_path_str}: {e}"
+                )
+
+    return files_processed
+
+
 def process_directory(
     root_dir: str, output_file: str, spec: pathspec.PathSpec
 ):
@@ -91,56 +288,30 @@ def process_directory(
     """
     root_path = Path(root_dir).resolve()
     output_path = Path(output_file).resolve()
-    files_processed = 0
 
     print(f"Starting to process directory: {root_path}")
     print(f"Output will be saved to: {output_path}")
     print("Ignoring files based on .gitignore and a default list.")
 
     with open(output_path, "w", encoding="utf-8") as outfile:
-        for dirpath, dirnames, filenames in os.walk(root_path, topdown=True):
-            current_path = Path(dirpath)
-
-            # Filter out ignored directories so os.walk doesn't descend into them
-            # Must modify dirnames in place
-            dirnames[:] = [d for d in dirnames if not spec.match_file(str((current_path / d).relative_to(root_path)).replace("\\", "/") + "/")]
-
-            for filename in filenames:
-                full_file_path = current_path / filename
-                relative_file_path = full_file_path.relative_to(root_path)
-                relative_file_path_str = str(relative_file_path).replace(
-                    "\\", "/"
-                )
-
-                if not spec.match_file(relative_file_path_str):
-                    try:
-                        with open(
-                            full_file_path, "r", encoding="utf-8"
-                        ) as infile:
-                            content = infile.read()
-
-                        outfile.write(f"{HEADER_LINE}\n")
-                        outfile.write(f"File: {relative_file_path_str}\n")
-                        outfile.write(f"{HEADER_LINE}\n\n")
-                        outfile.write(content)
-                        outfile.write(FILE_SEPARATOR)
-
-                        print(f"  [+] Added: {relative_file_path_str}")
-                        files_processed += 1
-
-                    except UnicodeDecodeError:
-                        print(
-                            f"  [!] Skipped (binary file): {relative_file_path_str}"
-                        )
-                    except Exception as e:
-                        print(
-                            f"  [!] Error reading {relative_file_path_str}: {e}"
-                        )
+        files_processed = _write_directory(root_path, outfile, spec)
 
     print("\nProcessing complete.")
     print(f"Total files added to {output_file}: {files_processed}")
 
 
+def process_directory_to_string(
+    root_dir: str, spec: pathspec.PathSpec, verbose: bool = False
+) -> str:
+    """
+    Same output as process_directory, returned as a string instead of written to disk.
+    Only read errors are printed unless `verbose` is set.
+    """
+    buffer = io.StringIO()
+    _write_directory(Path(root_dir).resolve(), buffer, spec, verbose=verbose)
+    return buffer.getvalue()
+
+
 def main():
     """Main function to parse arguments and start the process."""
     parser = argparse.ArgumentParser(
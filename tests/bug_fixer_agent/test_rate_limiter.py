@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+from bug_fixer_agent.rate_limiter import RateLimiter
+
+
+def test_rate_limiter_allows_at_most_rpm_calls_per_period():
+    """
+    No more than `rpm` acquisitions succeed within any one period, including the first,
+    and the limiter keeps going once older calls leave the window.
+    """
+    limiter = RateLimiter(rpm=3, period=0.2)
+
+    async def acquire_all(count):
+        starts = []
+        for _ in range(count):
+            await limiter.acquire()
+            starts.append(time.monotonic())
+        return starts
+
+    starts = asyncio.run(acquire_all(7))
+
+    # The first `rpm` calls are not delayed
+    assert starts[2] - starts[0] < 0.1
+    # Call i + rpm only starts once call i has left the window (less a little timestamping slack)
+    assert all(later - earlier >= 0.19 for earlier, later in zip(starts, starts[3:]))
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bug_fixer_agent.bug_definitions import Bug
+from bug_fixer_agent.run import BugFixerRunner
+
+
+_VALID_SNIPPET = "File: backend/todos/views.py\n```python\n    return Todo.objects.filter(user=self.request.user)\n```"
+
+_BUGS = tuple(
+    Bug(name=name, description="", files=(), root_cause="", fix_summary="")
+    for name in ("Fixed Bug", "Failed Bug")
+)
+
+
+def _fix_for(bug_name):
+    if bug_name == "Fixed Bug":
+        return _VALID_SNIPPET, {"bug_name": bug_name}
+    return "", {"error": "API call failed: boom"}
+
+
+@pytest.fixture
+def runner():
+    """
+    BugFixerRunner with a stub Config and a mocked agent; nothing touches the network.
+    """
+    config = SimpleNamespace(use_cache=True, use_batch=False, max_concurrency=1, max_workers=2)
+    with patch("bug_fixer_agent.run.Config", return_value=config), \
+            patch("bug_fixer_agent.run.AsyncBugFixerAgent", return_value=MagicMock()):
+        runner = BugFixerRunner()
+    runner.agent.get_fix_summary.return_value = {"files_affected": ["backend/todos/views.py"]}
+    runner.agent.aclose = AsyncMock()
+    return runner
+
+
+def test_run_async_processes_bugs_concurrently_in_order(runner):
+    """
+    The runner does not cap concurrency itself (the agent does), so both fixes are in flight
+    together even with max_concurrency = 1. Results keep the order of the input bugs.
+    """
+    started = []
+
+    async def generate_fix_async(bug_name, codebase_content):
+        started.append(bug_name)
+        # Only returns once both bugs have started, which would deadlock under a runner-level limit of 1
+        while len(started) < len(_BUGS):
+            await asyncio.sleep(0)
+        return _fix_for(bug_name)
+
+    async def generate_failure_analysis_and_suggestions_async(**kwargs):
+        return {"analysis": f"Suggestions for {kwargs['bug_name']}", "success": True}
+
+    runner.agent.generate_fix_async = generate_fix_async
+    runner.agent.generate_failure_analysis_and_suggestions_async = generate_failure_analysis_and_suggestions_async
+
+    bug_results = asyncio.run(asyncio.wait_for(runner._run_async(list(_BUGS), "codebase"), timeout=5))
+
+    assert [result.bug_name for result in bug_results] == ["Fixed Bug", "Failed Bug"]
+    assert bug_results[0].status == "solution_generated"
+    assert bug_results[0].generated_code_solution == _VALID_SNIPPET
+    assert bug_results[1].status == "failed_to_generate_solution"
+    assert bug_results[1].error == "API call failed: boom"
+    assert bug_results[1].ai_suggestions == "Suggestions for Failed Bug"
+    runner.agent.aclose.assert_awaited_once()
+
+
+def test_run_threaded_returns_results_in_input_order(runner):
+    """
+    The thread pool path records the same statuses and keeps the order of the input bugs.
+    """
+    runner.agent.generate_fix.side_effect = lambda bug_name, codebase_content: _fix_for(bug_name)
+    runner.agent.generate_failure_analysis_and_suggestions.return_value = {"analysis": "", "success": False}
+
+    bug_results = runner._run_threaded(list(_BUGS), "codebase")
+
+    assert [result.bug_name for result in bug_results] == ["Fixed Bug", "Failed Bug"]
+    assert [result.status for result in bug_results] == ["solution_generated", "failed_to_generate_solution"]
+    assert bug_results[1].ai_suggestions == "Could not generate intelligent suggestions due to API error."
+    runner.agent.generate_failure_analysis_and_suggestions.assert_called_once()
@@ -0,0 +1,102 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import inspector
+from inspector import compile_ignore_matcher, get_gitignore_spec
+
+
+_SAMPLE_PATHS = (
+    ".git/",
+    "frontend/.git/",
+    "backend/__pycache__/",
+    "backend/todos/views.cpython-313.pyc",
+    ".env",
+    ".env.local",
+    "backend/.env.production",
+    "node_modules/",
+    "frontend/node_modules/",
+    "frontend/package-lock.json",
+    "uv.lock",
+    "bug_fixer_agent/",
+    "bug_fixer_agent/agent.py",
+    "tests/",
+    "frontend/tests/",
+    "README.md",
+    "docs/README.md",
+    "codebase_content.txt",
+    "db.sqlite3",
+    "backend/db.sqlite3",
+    "LICENSE",
+    "frontend/src/components/TodoList.tsx",
+    "frontend/src/services/api.ts",
+    "backend/todos/views.py",
+    "backend/todos/serializers.py",
+    "backend/manage.py",
+)
+
+
+@pytest.fixture(scope="module")
+def default_spec(tmp_path_factory):
+    """The inspector's default patterns, without any project .gitignore."""
+    return get_gitignore_spec(tmp_path_factory.mktemp("project"), "codebase_content.txt")
+
+
+@pytest.mark.parametrize("path", _SAMPLE_PATHS)
+def test_ignore_matcher_agrees_with_pathspec(default_spec, path):
+    """
+    The combined regex ignores exactly the paths pathspec itself would.
+    """
+    assert compile_ignore_matcher(default_spec)(path) == default_spec.match_file(path)
+
+
+def test_default_patterns_use_the_combined_regex(default_spec):
+    """
+    The default patterns combine into one regex rather than falling back to pathspec.
+    """
+    assert compile_ignore_matcher(default_spec) != default_spec.match_file
+
+
+def test_ignore_matcher_falls_back_when_patterns_do_not_combine():
+    """
+    A pattern regex that cannot be combined (here, a back-reference to a stripped group name)
+    falls back to spec.match_file instead of raising.
+    """
+    spec = SimpleNamespace(
+        patterns=[SimpleNamespace(include=True, regex=re.compile(r"(?P<name>a)(?P=name)"))],
+        match_file=lambda path: path == "aa",
+    )
+
+    assert compile_ignore_matcher(spec) == spec.match_file
+
+
+def test_read_ahead_bounds_reads_in_flight(monkeypatch, tmp_path):
+    """
+    Reads run ahead of the consumer by at most READ_WINDOW files, and results keep input order.
+    """
+    monkeypatch.setattr(inspector, "READ_WINDOW", 3)
+    started = []
+    lock = threading.Lock()
+
+    def read(path):
+        with lock:
+            started.append(path)
+        return path.name, None
+
+    monkeypatch.setattr(inspector, "_read_safely", read)
+    paths = [tmp_path / f"{i}.txt" for i in range(10)]
+
+    results = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for content, _ in inspector._read_ahead(executor, paths):
+            # Let every submitted read start before checking how far ahead they are
+            time.sleep(0.01)
+            with lock:
+                assert len(started) - len(results) <= 3
+            results.append(content)
+
+    assert results == [path.name for path in paths]